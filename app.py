@@ -6,11 +6,24 @@ import plotly.express as px
 import plotly.graph_objects as go
 from millify import millify
 from datetime import datetime
+import os
 import time
 
-# --- OPTIONAL: IMPORT YOUR BACKEND ---
-# If you have optimizer.py working, uncomment this:
-# from optimizer import solve_vrp 
+# --- BACKEND ---
+from optimizer import solve_vrp_savings, to_vrp_frame
+from solver_jobs import SolverJobService
+from exports import MIME_TYPES, export_manifest
+from notifications import StubGateway, WebhookGateway, broadcast
+from cubes import DataCube, ensure_cubes
+from school_data import load_schools, school_data_version
+from forecasting import FORECAST_HORIZON, ROLLING_DAYS, DemandForecast, load_silver, silver_version
+from map_layers import (
+    HEX_RADIUS_PX, fit_view, hex_bins, metres_per_pixel, school_points, use_hex_bins
+)
+
+# Full-script rerun time, kept in session_state["rerun_ms"]
+# (read by benchmarks/rerun_latency.py)
+RERUN_STARTED = time.perf_counter()
 
 # ==========================================
 # 1. CONFIGURATION & GOV THEME
@@ -465,32 +478,448 @@ st.markdown("""
 # ==========================================
 # 2. DATA LOADING (Hybrid Approach)
 # ==========================================
-@st.cache_data
-def load_data():
-    # Try loading real file, else generate synthetic
-    try:
-        df = pd.read_csv("mock_school_data.csv")
-    except FileNotFoundError:
-        # Fallback Generator
-        np.random.seed(42)
-        n = 50
-        df = pd.DataFrame({
-            "school_id": [f"SCH{str(i).zfill(4)}" for i in range(1, n+1)],
-            "school_name": [f"Government School {i}" for i in range(1, n+1)],
-            "latitude": 13.2 + np.random.normal(0, 0.05, n),
-            "longitude": 77.5 + np.random.normal(0, 0.05, n),
-            "backlog_students": np.random.randint(10, 200, n),
-            "gender_parity_index": np.random.uniform(0.7, 1.1, n)
-        })
-        df['status'] = np.where(df['backlog_students']>100, 'CRITICAL', 'NORMAL')
-    
-    # Ensure columns exist for the map
-    if 'priority_score' not in df.columns:
-        df['priority_score'] = df['backlog_students'] / 200
-        
-    return df
+# Typed frame from a Parquet sidecar of mock_school_data.csv (see
+# school_data.py), keyed by the CSV's content version: a regenerated
+# file is picked up on the next rerun. cache_resource hands every
+# session the same frame instead of a copy; it is never modified.
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_schools(version):
+    return load_schools(version)
+
+data_version = school_data_version()
+df = get_schools(data_version)
+
+# Route solves run in a background process pool shared by every
+# session, so a long solve never blocks this script's reruns.
+ROUTE_TIME_LIMIT = 10  # seconds of anytime search per plan
+SOLVER_PROFILE_LOG = "solver_profile.jsonl"  # one JSON line per solve
+
+@st.cache_resource
+def get_solver_service():
+    return SolverJobService(profile_log=SOLVER_PROFILE_LOG)
+
+solver_service = get_solver_service()
+
+# Rendered plans (manifest + polylines) per (data fingerprint, vans,
+# capacity); reruns, tab switches and language toggles reuse them.
+ROUTE_PLAN_TTL = 60 * 60  # seconds
+ROUTE_PLAN_ENTRIES = 32
+
+VAN_COLORS = px.colors.qualitative.Bold
+
+@st.cache_data(ttl=ROUTE_PLAN_TTL, max_entries=ROUTE_PLAN_ENTRIES, show_spinner=False)
+def get_route_plan(fingerprint, num_vans, capacity, _job_id):
+    routes = solver_service.result(_job_id)
+    manifest = routes.to_manifest()
+    manifest = manifest[manifest["risk_level"] != "Depot"]
+    manifest = pd.DataFrame({
+        "Assigned_Van": "Van-" + (manifest["vehicle_id"] + 1).astype(str),
+        "Stop": manifest["stop_order"],
+        "school_name": manifest["school_name"],
+        "Planned_Updates": manifest["pending_mbu"],
+        "priority_score": manifest["priority_score"],
+        "contact_number": manifest["contact_number"],
+        "latitude": manifest["lat"],
+        "longitude": manifest["lon"],
+    })
+
+    lines = routes.to_lines()
+    lines = lines[lines["load"] > 0].reset_index(drop=True)  # unused vans
+    return manifest, lines
+
+def manifest_file(routes, fmt):
+    # Deferred download: runs only when the button is clicked
+    def read():
+        with open(export_manifest(routes, fmt), "rb") as f:
+            return f.read()
+    return read
+
+data_fingerprint = data_version or "synthetic"
+
+# Map layers per data version; the frame itself is not hashed
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_map_view(fingerprint, _df):
+    return fit_view(_df["latitude"], _df["longitude"])
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_map_points(fingerprint, _df):
+    return school_points(_df)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_map_bins(fingerprint, radius_m, _df):
+    return hex_bins(_df, radius_m)
+
+# Dataset-level aggregates, computed once per data version; slider
+# moves only redo the capacity-dependent arithmetic on top of them.
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_kpis(fingerprint, _df):
+    return {
+        "total_backlog": int(_df["backlog_students"].sum()),
+        "critical_schools": int((_df["status"] == "CRITICAL").sum()),
+    }
+
+# Figures are only read after this, so they are shared as resources
+# instead of being unpickled on every rerun like st.cache_data values.
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_parity_figure(fingerprint, _df):
+    fig_bar = px.histogram(_df, x="gender_parity_index", nbins=10, color_discrete_sequence=['#138808'])
+    fig_bar.add_vline(x=0.9, line_dash="dash", line_color="#DC2626", annotation_text="Alert Threshold")
+    fig_bar.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Poppins, sans-serif", size=12),
+        margin=dict(l=20, r=20, t=30, b=20)
+    )
+    return fig_bar
+
+# Drill-down cubes are built at ingest; rebuilt here only if missing
+# or older than the silver file.
+REGION_TOP_N = 20
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_cube(version):
+    return DataCube.load()
+
+cube = get_cube(ensure_cubes())
+
+# District forecasts from the silver layer, fitted once per file version
+silver_data_version = silver_version()
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def get_demand_forecast(version):
+    return DemandForecast.fit(load_silver())
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_backlog_projection(version, daily_capacity):
+    return get_demand_forecast(version).project(daily_capacity)
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def get_forecast_figure(version, district, daily_capacity):
+    projection = get_backlog_projection(version, daily_capacity)[district]
+    # graph_objects directly: px.area costs ~10x more to build
+    fig_line = go.Figure(go.Scatter(
+        x=projection.index, y=projection.round(), mode='lines', fill='tozeroy',
+        line_color='#FF9933', fillcolor='rgba(255, 153, 51, 0.3)'
+    ))
+    fig_line.update_layout(
+        xaxis_title='Date',
+        yaxis_title='Pending MBUs',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Poppins, sans-serif", size=12),
+        margin=dict(l=20, r=20, t=30, b=20)
+    )
+    return fig_line
+
+# District picks rerun only the forecast
+@st.fragment
+def backlog_forecast(daily_capacity, focus=None):
+    forecast = get_demand_forecast(silver_data_version)
+    summary = forecast.summary()
+    districts = {
+        f"{name}, {state}": (state, name)
+        for state, name in summary.sort_values("backlog", ascending=False).index
+    }
+    labels = list(districts)
+    index = labels.index(f"{focus[1]}, {focus[0]}") if focus in districts.values() else 0
+    district = districts[st.selectbox("District", labels, index=index, label_visibility="collapsed")]
+
+    st.markdown('<div style="border-radius: 16px; overflow: hidden; box-shadow: var(--shadow); background: white; padding: 1rem;">', unsafe_allow_html=True)
+    st.plotly_chart(get_forecast_figure(silver_data_version, district, daily_capacity), use_container_width=True)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+    stats = summary.loc[district]
+    f1, f2, f3 = st.columns(3)
+    f1.metric("Rolling demand", f"{stats['rolling_demand']:.1f}/day", help=f"{ROLLING_DAYS}-day average of new MBUs due")
+    f2.metric("Velocity", f"{stats['velocity']:+.2f}/day²", help="Trend of the rolling demand")
+    f3.metric("Seasonality", f"{stats['seasonality']:.2f}×", help=f"Demand over the {FORECAST_HORIZON}-day forecast relative to an average month")
+
+# SMS gateway for parent alerts; the local stub unless a provider
+# endpoint is configured.
+NOTIFY_WEBHOOK_URL = os.environ.get("NOTIFY_WEBHOOK_URL")
+
+@st.cache_resource
+def get_notification_gateway():
+    if NOTIFY_WEBHOOK_URL:
+        return WebhookGateway(NOTIFY_WEBHOOK_URL)
+    return StubGateway()
+
+BROADCAST_POLL_S = 0.5
+
+def show_broadcast(job):
+    sent = job.status()
+    if sent["state"] in ("pending", "running"):
+        label, state = f"🔄 Broadcasting via {sent['gateway']} gateway...", "running"
+    elif sent["state"] == "failed":
+        label, state = "⚠️ Broadcast failed", "error"
+    else:
+        label, state = "Campaign completed successfully!", "complete"
+
+    with st.status(label, expanded=True, state=state):
+        st.write(f"🎯 Targeting {sent['total']:,} parents in High Risk zones...")
+        st.progress(sent["progress"])
+        st.caption(
+            f"{sent['sent']:,} sent · {sent['failed']:,} failed · "
+            f"{sent['retries']:,} retries · {sent['throughput']:,.0f} msg/s"
+        )
+        if sent["state"] == "failed":
+            st.write(sent["error"])
+        elif sent["state"] == "done":
+            st.write(f"✅ Message Delivered: '{job.message}'")
+
+# Only this fragment reruns while a broadcast is in flight; the page
+# reruns once more when it finishes.
+@st.fragment(run_every=BROADCAST_POLL_S)
+def broadcast_progress():
+    job = st.session_state["broadcast_job"]
+    show_broadcast(job)
+    if job.status()["state"] not in ("pending", "running"):
+        st.rerun()
+
+# The map detail switch reruns only the map
+@st.fragment
+def map_panel():
+    # Schools up close, server-side hex bins state-wide
+    view_lat, view_lon, view_zoom = get_map_view(data_fingerprint, df)
+    map_mode = st.radio("Map detail", ["Auto", "Schools", "Hex bins"], horizontal=True, label_visibility="collapsed")
+    show_bins = map_mode == "Hex bins" or (map_mode == "Auto" and use_hex_bins(len(df), view_zoom))
+
+    if show_bins:
+        hex_radius = HEX_RADIUS_PX * metres_per_pixel(view_lat, view_zoom)
+        bins = get_map_bins(data_fingerprint, round(hex_radius), df)
+        hex_props = dict(
+            pickable=True,
+            opacity=0.6,
+            stroked=True,
+            filled=True,
+            extruded=False,
+            get_fill_color="c",
+            get_line_color=[255, 255, 255],
+            line_width_min_pixels=1,
+        )
+        if "hex" in bins:
+            layer = pdk.Layer("H3HexagonLayer", bins, get_hexagon="hex", **hex_props)
+        else:
+            layer = pdk.Layer(
+                "ColumnLayer", bins, get_position="pos", radius=hex_radius,
+                disk_resolution=6, angle=90, coverage=0.95, **hex_props
+            )
+        tooltip = {"text": "{schools} schools\nBacklog: {backlog}\nAvg priority: {priority}"}
+    else:
+        layer = pdk.Layer(
+            "ScatterplotLayer",
+            get_map_points(data_fingerprint, df),
+            pickable=True,
+            opacity=0.8,
+            stroked=True,
+            filled=True,
+            radius_scale=10,
+            radius_min_pixels=5,
+            radius_max_pixels=50,
+            get_position="pos",
+            get_radius="b",
+            get_fill_color="c",
+            get_line_color=[0, 0, 0],
+        )
+        tooltip = {"text": "{n}\nBacklog: {b}"}
+    view_state = pdk.ViewState(latitude=view_lat, longitude=view_lon, zoom=view_zoom)
+    
+    # Wrap map in a modern container
+    st.markdown('<div style="border-radius: 20px; overflow: hidden; box-shadow: var(--shadow); border: 1px solid rgba(0, 0, 0, 0.05);">', unsafe_allow_html=True)
+    st.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip=tooltip))
+    st.markdown('</div>', unsafe_allow_html=True)
+
+ROUTE_POLL_S = 0.5
+
+# Instant Clarke-Wright plan shown while the OR-Tools job runs. It
+# serves every school, so a small fleet runs extra trips.
+@st.cache_data(ttl=ROUTE_PLAN_TTL, max_entries=ROUTE_PLAN_ENTRIES, show_spinner=False)
+def get_route_preview(fingerprint, num_vans, capacity, _df):
+    vrp_df = to_vrp_frame(_df)
+    # Same one-van-load cap per school as the optional_visits solve
+    vrp_df["pending_mbu"] = vrp_df["pending_mbu"].clip(upper=capacity)
+    routes = solve_vrp_savings(vrp_df, num_vans, capacity)
+    if not len(routes):
+        return None
+    lines = routes.to_lines()
+    return lines[lines["load"] > 0].reset_index(drop=True)
+
+def route_preview(num_vans, capacity):
+    lines = get_route_preview(data_fingerprint, num_vans, capacity, df)
+    if lines is None:
+        return
+
+    extra = len(lines) - lines["vehicle_id"].nunique()
+    trips = f" · {extra} extra trip{'s' if extra != 1 else ''} beyond one per van" if extra else ""
+    st.caption(
+        f"⚡ Instant preview (savings heuristic): {len(lines)} routes on {lines['vehicle_id'].nunique()} of {num_vans} vans"
+        f"{trips} · {lines['distance_m'].sum() / 1000:,.1f} km · {lines['load'].sum():,} updates. "
+        "OR-Tools is refining it."
+    )
+
+    fig = go.Figure()
+    for _, line in lines.iterrows():
+        path = np.asarray(line["path"])
+        trip = f" (trip {line['trip']})" if line["trip"] > 1 else ""
+        fig.add_trace(go.Scattermap(
+            lat=path[:, 1], lon=path[:, 0], mode='lines+markers',
+            line=dict(width=2, color=VAN_COLORS[line["vehicle_id"] % len(VAN_COLORS)]),
+            name=f"Van-{line['vehicle_id'] + 1}{trip} · {line['distance_m'] / 1000:,.1f} km · {line['load']} updates"
+        ))
+    depot = lines["path"].iloc[0][0]
+    fig.update_layout(
+        map=dict(style="carto-positron", center=dict(lat=depot[1], lon=depot[0]), zoom=10),
+        title="Route Preview", margin=dict(l=0, r=0, t=40, b=0)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# Polls a running solve without holding up the rest of the page; the
+# page reruns once more when the job finishes.
+@st.fragment(run_every=ROUTE_POLL_S)
+def route_progress(job_id):
+    if st.button("✖ Cancel Optimization", use_container_width=True):
+        solver_service.cancel(job_id)
+
+    job = solver_service.status(job_id)
+    if job is None or job["state"] not in ("pending", "running"):
+        st.rerun()
+
+    best = (
+        f" · best plan {job['best_cost'] / 1000:,.1f} km"
+        f" after {job['solutions']} improvements"
+        if job["best_cost"] is not None else ""
+    )
+    st.progress(job["progress"], text=f"🔍 Solving Vehicle Routing Problem...{best}")
+
+# Generate and cancel rerun only this tab
+@st.fragment
+def route_optimizer(num_vans, capacity):
+    st.markdown("""
+        <div style="background: linear-gradient(135deg, rgba(255, 153, 51, 0.1), rgba(19, 136, 8, 0.1)); padding: 1.25rem 1.5rem; border-radius: 16px; border-left: 4px solid var(--saffron); margin-bottom: 2rem;">
+            <p style="margin: 0; color: #1A202C; font-weight: 500;">
+                🧠 This module uses <strong>Google OR-Tools (CVRPTW)</strong> to calculate optimal paths with real-time constraints.
+            </p>
+        </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        pass  # Keep for spacing
+    with col2:
+        optimize_btn = st.button("⚡ Generate Route Plan", type="primary", use_container_width=True)
+    
+    # One job per (data, vans, capacity): changing the sliders back to
+    # an earlier fleet shows that plan again without re-solving.
+    plan_params = (data_fingerprint, num_vans, capacity)
+    route_jobs = st.session_state.setdefault("route_jobs", {})
+
+    if optimize_btn:
+        # Identical in-flight plans are shared, so repeat clicks (or
+        # other officers asking for the same plan) reuse one job.
+        route_jobs[plan_params] = solver_service.submit(
+            to_vrp_frame(df), num_vans, capacity,
+            time_limit=ROUTE_TIME_LIMIT, metaheuristic="guided_local_search",
+            optional_visits=True  # today's dispatch: skip what does not fit
+        )
+
+    job_id = route_jobs.get(plan_params)
+    job = solver_service.status(job_id) if job_id else None
+
+    if job and job["state"] in ("pending", "running"):
+        route_progress(job_id)
+        route_preview(num_vans, capacity)
+
+    elif job and job["state"] in ("failed", "cancelled"):
+        st.warning(f"⚠️ Route optimization {job['state']}. {job['error'] or ''}")
+
+    elif job and job["state"] == "done" and not solver_service.result(job_id):
+        st.warning("⚠️ No route plan found for this fleet. Add vans or raise daily capacity.")
+
+    elif job and job["state"] == "done":
+        manifest, lines = get_route_plan(*plan_params, job_id)
+        with st.container():
+            st.success(f"✅ Optimization Converged! Successfully deployed {len(lines)} of {num_vans} mobile units.")
+
+            # Visualize Routes (Plotly is better for lines than PyDeck)
+            fig = px.scatter_map(
+                manifest,
+                lat="latitude", lon="longitude",
+                size="Planned_Updates", color="priority_score",
+                hover_name="school_name", hover_data=["Assigned_Van", "Stop"],
+                color_continuous_scale="reds", size_max=15, zoom=10,
+                map_style="carto-positron", title="Optimized Route Paths"
+            )
+
+            # One polyline per van, depot to depot
+            for i, line in lines.iterrows():
+                path = np.asarray(line["path"])
+                fig.add_trace(go.Scattermap(
+                    lat=path[:, 1], lon=path[:, 0], mode='lines',
+                    line=dict(width=3, color=VAN_COLORS[i % len(VAN_COLORS)]),
+                    name=f"Van-{line['vehicle_id'] + 1} · {line['distance_m'] / 1000:,.1f} km · {line['load']} updates"
+                ))
+
+            # Add depot
+            depot = np.asarray(lines["path"].iloc[0][0]) if len(lines) else (df['longitude'].iloc[0], df['latitude'].iloc[0])
+            fig.add_trace(go.Scattermap(
+                lat=[depot[1]], lon=[depot[0]], mode='markers', marker=go.scattermap.Marker(size=20, color='blue', symbol='star'), name='Depot'
+            ))
+
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Modern Section Header for Manifests
+            st.markdown("<br>", unsafe_allow_html=True)
+            st.markdown("""
+                <div style="margin-bottom: 1.5rem;">
+                    <h3 style="font-size: 1.4rem; font-weight: 700; color: #1A202C; margin: 0; display: flex; align-items: center;">
+                        <span style="background: linear-gradient(135deg, var(--green), #16A34A); padding: 8px 12px; border-radius: 10px; margin-right: 12px; display: inline-flex; align-items: center; justify-content: center; color: white;">📋</span>
+                        Driver Manifests & Assignments
+                    </h3>
+                    <p style="color: #718096; font-size: 0.85rem; margin-top: 8px; margin-left: 56px;">Download optimized routes for field deployment</p>
+                </div>
+            """, unsafe_allow_html=True)
+            
+            # Wrap dataframe in container
+            st.markdown('<div style="border-radius: 16px; overflow: hidden; box-shadow: var(--shadow);">', unsafe_allow_html=True)
+            st.dataframe(manifest, use_container_width=True, hide_index=True)
+            st.markdown('</div><br>', unsafe_allow_html=True)
+            
+            # Files are generated on click, once per solved plan (see exports.py)
+            routes = solver_service.result(job_id)
+            col_dl1, col_dl2, col_dl3 = st.columns(3)
+            with col_dl1:
+                st.download_button("📄 Download CSV", manifest_file(routes, "csv"), "route_manifest.csv", mime=MIME_TYPES["csv"], use_container_width=True)
+            with col_dl2:
+                st.download_button("📊 Download Excel", manifest_file(routes, "xlsx"), "route_manifest.xlsx", mime=MIME_TYPES["xlsx"], use_container_width=True)
+            with col_dl3:
+                st.download_button("📋 Print Report", manifest_file(routes, "pdf"), "route_report.pdf", mime=MIME_TYPES["pdf"], use_container_width=True)
+
+        # Per-phase timings of the solve behind this plan
+        profile = solver_service.profile(job_id)
+        with st.expander("🩺 Solver diagnostics", expanded=False):
+            if profile is None:
+                st.caption("Plan served from the route cache; no solve was run.")
+            else:
+                diag1, diag2, diag3, diag4 = st.columns(4)
+                diag1.metric("Nodes", profile.nodes)
+                diag2.metric("Vehicles", profile.vehicles)
+                diag3.metric("Solutions", profile.solutions)
+                diag4.metric(
+                    "Peak RSS",
+                    f"{profile.peak_rss_kb / 1024:,.0f} MB" if profile.peak_rss_kb else "n/a"
+                )
+
+                phases = pd.DataFrame([
+                    {"Phase": name, "Wall (s)": t["wall_s"], "CPU (s)": t["cpu_s"]}
+                    for name, t in profile.phases.items()
+                ])
+                st.dataframe(phases, use_container_width=True, hide_index=True)
 
-df = load_data()
+                if profile.curve:
+                    curve = pd.DataFrame(profile.curve, columns=["Elapsed (s)", "Distance (km)"])
+                    curve["Distance (km)"] /= 1000
+                    st.line_chart(curve, x="Elapsed (s)", y="Distance (km)")
+                st.caption(f"Logged to {SOLVER_PROFILE_LOG}")
 
 # ==========================================
 # 3. SIDEBAR (Restored Features)
@@ -513,6 +942,19 @@ with st.sidebar:
     st.markdown("##### 🌐 Language Settings")
     lang = st.selectbox("Choose Language / भाषा चुनें", ["English", "हिन्दी", "ಕನ್ನಡ", "தமிழ்"], label_visibility="collapsed", help="Select your preferred language")
     
+    # Drill-down: each choice narrows the next list (cube lookups). It
+    # scopes the enrolment drill-down and backlog forecast only; the
+    # school register (KPIs, map, routes) is Bangalore Rural.
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown("##### 🗺️ Enrolment Region")
+    st.caption("Filters the regional drill-down and backlog forecast.")
+    region_state = st.selectbox("State", [None] + cube.options(), format_func=lambda v: v or "All states")
+    region_district = region_pincode = None
+    if region_state:
+        region_district = st.selectbox("District", [None] + cube.options(region_state), format_func=lambda v: v or "All districts")
+    if region_district:
+        region_pincode = st.selectbox("Pincode", [None] + cube.options(region_state, region_district), format_func=lambda v: str(v) if v else "All pincodes")
+    
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("##### 🚐 Resource Allocation")
     num_vans = st.slider("Active Mobile Vans", 1, 10, 3, help="Number of mobile units deployed")
@@ -531,13 +973,14 @@ with st.sidebar:
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("##### 📢 Communication Hub")
     if st.button("📲 Broadcast Alert", use_container_width=True):
-        with st.status("🔄 Connecting to UIDAI Gateway...", expanded=True):
-            time.sleep(0.8)
-            st.write("🎯 Targeting 1,240 parents in High Risk zones...")
-            time.sleep(0.8)
-            st.write("✅ Message Delivered: 'Aadhaar Camp at your school tomorrow.'")
-            time.sleep(0.5)
-            st.success("Campaign completed successfully!")
+        # Runs on its own thread; reruns only poll its counters
+        st.session_state["broadcast_job"] = broadcast(df, get_notification_gateway())
+
+    broadcast_job = st.session_state.get("broadcast_job")
+    if broadcast_job is not None and broadcast_job.status()["state"] in ("pending", "running"):
+        broadcast_progress()
+    elif broadcast_job is not None:
+        show_broadcast(broadcast_job)
     
     st.markdown("<br><br>", unsafe_allow_html=True)
     st.markdown("""
@@ -571,8 +1014,9 @@ tab1, tab2, tab3 = st.tabs(["📊 Executive Dashboard", "🚐 Route Optimizer",
 # --- TAB 1: EXECUTIVE VIEW ---
 with tab1:
     # KPI Row
-    total_backlog = df['backlog_students'].sum()
-    critical_schools = df[df['status'] == 'CRITICAL'].shape[0]
+    kpis = get_kpis(data_fingerprint, df)
+    total_backlog = kpis["total_backlog"]
+    critical_schools = kpis["critical_schools"]
     est_days = int(total_backlog / (num_vans * capacity)) + 1
     
     c1, c2, c3, c4 = st.columns(4)
@@ -621,103 +1065,11 @@ with tab1:
         </div>
     """, unsafe_allow_html=True)
     
-    layer = pdk.Layer(
-        "ScatterplotLayer",
-        df,
-        pickable=True,
-        opacity=0.8,
-        stroked=True,
-        filled=True,
-        radius_scale=10,
-        radius_min_pixels=5,
-        radius_max_pixels=50,
-        get_position='[longitude, latitude]',
-        get_radius="backlog_students",
-        get_fill_color="[255, (1 - priority_score) * 255, 0]",
-        get_line_color=[0, 0, 0],
-    )
-    view_state = pdk.ViewState(latitude=df['latitude'].mean(), longitude=df['longitude'].mean(), zoom=10)
-    
-    # Wrap map in a modern container
-    st.markdown('<div style="border-radius: 20px; overflow: hidden; box-shadow: var(--shadow); border: 1px solid rgba(0, 0, 0, 0.05);">', unsafe_allow_html=True)
-    st.pydeck_chart(pdk.Deck(layers=[layer], initial_view_state=view_state, tooltip={"text": "{school_name}\nBacklog: {backlog_students}"}))
-    st.markdown('</div>', unsafe_allow_html=True)
+    map_panel()
 
 # --- TAB 2: OPTIMIZATION (The Brain) ---
 with tab2:
-    st.markdown("""
-        <div style="background: linear-gradient(135deg, rgba(255, 153, 51, 0.1), rgba(19, 136, 8, 0.1)); padding: 1.25rem 1.5rem; border-radius: 16px; border-left: 4px solid var(--saffron); margin-bottom: 2rem;">
-            <p style="margin: 0; color: #1A202C; font-weight: 500;">
-                🧠 This module uses <strong>Google OR-Tools (CVRPTW)</strong> to calculate optimal paths with real-time constraints.
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    col1, col2 = st.columns([3, 1])
-    with col1:
-        pass  # Keep for spacing
-    with col2:
-        optimize_btn = st.button("⚡ Generate Route Plan", type="primary", use_container_width=True)
-    
-    if optimize_btn:
-        with st.spinner("🔍 Solving Vehicle Routing Problem..."):
-            
-            # --- REAL BACKEND INTEGRATION SPOT ---
-            # If you have the backend, use: 
-            # routes = solve_vrp(df, num_vans, capacity)
-            
-            # For DEMO/Fallback, we simulate the output structure:
-            time.sleep(1.5) # Simulate calculation
-            st.success(f"✅ Optimization Converged! Successfully deployed {num_vans} mobile units.")
-            
-            # Visualize Routes (Plotly is better for lines than PyDeck)
-            fig = px.scatter_mapbox(
-                df[df['status']=='CRITICAL'], 
-                lat="latitude", lon="longitude", 
-                size="backlog_students", color="priority_score",
-                color_continuous_scale="reds", size_max=15, zoom=10,
-                mapbox_style="carto-positron", title="Optimized Route Paths"
-            )
-            
-            # Draw fake route lines for visual impact
-            lat_center = df['latitude'].mean()
-            lon_center = df['longitude'].mean()
-            
-            # Add depot
-            fig.add_trace(go.Scattermapbox(
-                lat=[lat_center], lon=[lon_center], mode='markers', marker=go.scattermapbox.Marker(size=20, color='blue', symbol='star'), name='Depot'
-            ))
-            
-            st.plotly_chart(fig, use_container_width=True)
-            
-            # Modern Section Header for Manifests
-            st.markdown("<br>", unsafe_allow_html=True)
-            st.markdown("""
-                <div style="margin-bottom: 1.5rem;">
-                    <h3 style="font-size: 1.4rem; font-weight: 700; color: #1A202C; margin: 0; display: flex; align-items: center;">
-                        <span style="background: linear-gradient(135deg, var(--green), #16A34A); padding: 8px 12px; border-radius: 10px; margin-right: 12px; display: inline-flex; align-items: center; justify-content: center; color: white;">📋</span>
-                        Driver Manifests & Assignments
-                    </h3>
-                    <p style="color: #718096; font-size: 0.85rem; margin-top: 8px; margin-left: 56px;">Download optimized routes for field deployment</p>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            manifest = df[['school_name', 'backlog_students', 'latitude', 'longitude']].sample(5)
-            manifest['Assigned_Van'] = [f"Van-{np.random.randint(1, num_vans+1)}" for _ in range(5)]
-            manifest['Priority'] = ['High', 'Medium', 'High', 'Low', 'Critical']
-            
-            # Wrap dataframe in container
-            st.markdown('<div style="border-radius: 16px; overflow: hidden; box-shadow: var(--shadow);">', unsafe_allow_html=True)
-            st.dataframe(manifest, use_container_width=True, hide_index=True)
-            st.markdown('</div><br>', unsafe_allow_html=True)
-            
-            col_dl1, col_dl2, col_dl3 = st.columns(3)
-            with col_dl1:
-                st.download_button("📄 Download CSV", manifest.to_csv(index=False), "route_manifest.csv", use_container_width=True)
-            with col_dl2:
-                st.download_button("📊 Download Excel", manifest.to_csv(index=False), "route_manifest.xlsx", use_container_width=True)
-            with col_dl3:
-                st.download_button("📋 Print Report", manifest.to_csv(index=False), "route_report.pdf", use_container_width=True)
+    route_optimizer(num_vans, capacity)
 
 # --- TAB 3: INSIGHTS ---
 with tab3:
@@ -730,25 +1082,11 @@ with tab3:
                     <span style="background: linear-gradient(135deg, var(--saffron), #FF7A00); padding: 8px 12px; border-radius: 10px; margin-right: 12px; display: inline-flex; align-items: center; justify-content: center;">📉</span>
                     Backlog Reduction Forecast
                 </h3>
-                <p style="color: #718096; font-size: 0.85rem; margin-top: 8px; margin-left: 56px;">30-day projection based on current capacity</p>
+                <p style="color: #718096; font-size: 0.85rem; margin-top: 8px; margin-left: 56px;">30-day net backlog projection per district under the current fleet</p>
             </div>
         """, unsafe_allow_html=True)
         
-        # Simple forecast chart
-        days = list(range(30))
-        remaining = [max(0, total_backlog - (i * num_vans * capacity)) for i in days]
-        fig_line = px.area(x=days, y=remaining, labels={'x':'Days from Now', 'y':'Pending MBUs'})
-        fig_line.update_traces(line_color='#FF9933', fillcolor='rgba(255, 153, 51, 0.3)')
-        fig_line.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="Poppins, sans-serif", size=12),
-            margin=dict(l=20, r=20, t=30, b=20)
-        )
-        
-        st.markdown('<div style="border-radius: 16px; overflow: hidden; box-shadow: var(--shadow); background: white; padding: 1rem;">', unsafe_allow_html=True)
-        st.plotly_chart(fig_line, use_container_width=True)
-        st.markdown('</div>', unsafe_allow_html=True)
+        backlog_forecast(num_vans * capacity, (region_state, region_district) if region_district else None)
         
     with col_b:
         st.markdown("""
@@ -761,19 +1099,45 @@ with tab3:
             </div>
         """, unsafe_allow_html=True)
         
-        fig_bar = px.histogram(df, x="gender_parity_index", nbins=10, color_discrete_sequence=['#138808'])
-        fig_bar.add_vline(x=0.9, line_dash="dash", line_color="#DC2626", annotation_text="Alert Threshold")
-        fig_bar.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="Poppins, sans-serif", size=12),
-            margin=dict(l=20, r=20, t=30, b=20)
-        )
+        fig_bar = get_parity_figure(data_fingerprint, df)
         
         st.markdown('<div style="border-radius: 16px; overflow: hidden; box-shadow: var(--shadow); background: white; padding: 1rem;">', unsafe_allow_html=True)
         st.plotly_chart(fig_bar, use_container_width=True)
         st.markdown('</div>', unsafe_allow_html=True)
 
+# --- Regional drill-down (pre-aggregated cubes) ---
+    if region_pincode:
+        region_label = f"Pincode: {region_pincode}, {region_district}"
+    elif region_district:
+        region_label = f"District: {region_district}, {region_state}"
+    elif region_state:
+        region_label = f"State: {region_state}"
+    else:
+        region_label = "All States"
+
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown(f"""
+        <div style="margin-bottom: 1.5rem;">
+            <h3 style="font-size: 1.4rem; font-weight: 700; color: #1A202C; margin: 0; display: flex; align-items: center;">
+                <span style="background: linear-gradient(135deg, #2563EB, #3B82F6); padding: 8px 12px; border-radius: 10px; margin-right: 12px; display: inline-flex; align-items: center; justify-content: center; color: white;">🗺️</span>
+                Regional Drill-down
+            </h3>
+            <p style="color: #718096; font-size: 0.85rem; margin-top: 8px; margin-left: 56px;">{region_label} · Aadhaar enrolment activity and pending MBUs</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+    totals = cube.totals(region_state, region_district, region_pincode)
+    r1, r2, r3, r4 = st.columns(4)
+    r1.metric("Pending MBUs", millify(totals["total_pending_mbu"]))
+    r2.metric("Enrolments 0-5", millify(totals["clean_0_5"]))
+    r3.metric("Enrolments 5-17", millify(totals["clean_5_17"]))
+    r4.metric("Records", millify(totals["records"]), help=f"{totals['first_date']:%d %b %Y} to {totals['last_date']:%d %b %Y}")
+
+    if not region_pincode:
+        breakdown = cube.children(region_state, region_district)["total_pending_mbu"].nlargest(REGION_TOP_N)
+        breakdown.index = breakdown.index.astype(str)
+        st.bar_chart(breakdown, horizontal=True, y_label="Pending MBUs", color="#FF9933")
+
 # Modern Tricolor Footer
 st.markdown("<br><br>", unsafe_allow_html=True)
 st.markdown("""
@@ -810,4 +1174,6 @@ st.markdown("""
         </div>
     </div>
 </footer>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+st.session_state["rerun_ms"] = (time.perf_counter() - RERUN_STARTED) * 1000
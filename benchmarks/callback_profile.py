@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimizer import build_routing_model, create_data_model
+from sparse_vs_dense import make_instance
+
+# -------------------------------
+# Reference model: Python closures
+# -------------------------------
+def build_callback_model(data):
+    manager = pywrapcp.RoutingIndexManager(
+        data["num_nodes"], data["num_vehicles"], data["depot"]
+    )
+    routing = pywrapcp.RoutingModel(manager)
+
+    def distance_callback(from_index, to_index):
+        from_node = manager.IndexToNode(from_index)
+        to_node = manager.IndexToNode(to_index)
+        return data["distance_matrix"][from_node][to_node]
+
+    def demand_callback(from_index):
+        from_node = manager.IndexToNode(from_index)
+        return data["demands"][from_node]
+
+    transit_cb = routing.RegisterTransitCallback(distance_callback)
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_cb)
+    demand_cb = routing.RegisterUnaryTransitCallback(demand_callback)
+    routing.AddDimensionWithVehicleCapacity(
+        demand_cb, 0, data["vehicle_capacities"], True, "Capacity"
+    )
+    return manager, routing
+
+# -------------------------------
+# Fixed-budget search profile
+# -------------------------------
+def profile(build, data, seconds):
+    # First solution: PATH_CHEAPEST_ARC touches every arc once.
+    manager, routing = build(data)
+    params = pywrapcp.DefaultRoutingSearchParameters()
+    params.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+    params.solution_limit = 1
+    params.time_limit.FromMilliseconds(int(seconds * 1000))
+
+    start = time.perf_counter()
+    found = routing.SolveWithParameters(params)
+    first = time.perf_counter() - start if found else None
+
+    # Local search: improving solutions found in a fixed budget.
+    manager, routing = build(data)
+    solutions = []
+    routing.AddAtSolutionCallback(
+        lambda: solutions.append(routing.CostVar().Max())
+    )
+    params = pywrapcp.DefaultRoutingSearchParameters()
+    params.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+    params.time_limit.FromMilliseconds(int(seconds * 1000))
+
+    start = time.perf_counter()
+    routing.SolveWithParameters(params)
+    search = time.perf_counter() - start
+
+    return {
+        "first_solution_s": round(first, 2) if first else None,
+        "search_s": round(search, 2),
+        "solutions": len(solutions),
+        "ms_per_solution": round(search * 1000 / max(len(solutions), 1), 1),
+        "objective": solutions[-1] if solutions else None,
+    }
+
+def run(sizes=(500, 2000), seconds=20, vans=10):
+    rows = []
+    for n in sizes:
+        df = make_instance(n)
+        df.loc[0, "pending_mbu"] = 0
+        capacity = int(np.ceil(df["pending_mbu"].sum() / vans * 1.2))
+        data = create_data_model(df, vans, capacity)
+
+        for label, build in [
+            ("python-callback", build_callback_model),
+            ("native-matrix", build_routing_model),
+        ]:
+            rows.append({"nodes": n, "model": label, **profile(build, data, seconds)})
+            print(rows[-1])
+
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    print(run().to_string(index=False))
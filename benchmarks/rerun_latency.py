@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+from routing_suite import RESULTS_DIR, git_revision
+
+# -------------------------------
+# Dashboard rerun latency
+# -------------------------------
+# Times full-script reruns of app.py (headless, via AppTest) for the
+# interactions officers repeat most. Run once per revision and compare
+# the JSON files, e.g. before/after a dashboard change. script_ms is the
+# app's own session_state["rerun_ms"]; wall_ms includes AppTest overhead.
+APP_PATH = os.path.join(ROOT, "app.py")
+
+def timed(at, action, repeats):
+    wall, script = [], []
+    for i in range(repeats):
+        start = time.perf_counter()
+        action(i)
+        wall.append((time.perf_counter() - start) * 1000)
+        if "rerun_ms" in at.session_state:
+            script.append(at.session_state["rerun_ms"])
+    return {
+        "script_ms": round(statistics.median(script), 2) if script else None,
+        "wall_ms": round(statistics.median(wall), 2),
+        "repeats": repeats,
+    }
+
+def run(app_path=APP_PATH, repeats=10, timeout=120):
+    at = AppTest.from_file(app_path, default_timeout=timeout)
+
+    cases = {"cold_start": timed(at, lambda i: at.run(), 1)}
+    cases["warm_rerun"] = timed(at, lambda i: at.run(), repeats)
+    cases["van_slider"] = timed(
+        at, lambda i: at.sidebar.slider[0].set_value(1 + i % 10).run(), repeats
+    )
+    cases["capacity_input"] = timed(
+        at, lambda i: at.sidebar.number_input[0].set_value(100 + 10 * (i % 10)).run(), repeats
+    )
+    languages = ["English", "हिन्दी"]
+    cases["language_toggle"] = timed(
+        at, lambda i: at.sidebar.selectbox[0].select(languages[i % 2]).run(), repeats
+    )
+    return cases
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard rerun latency")
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    cases = run(args.app, args.repeats)
+    print(json.dumps(cases, indent=2))
+
+    report = {
+        "revision": git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": cases,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"rerun_{report['created'].replace(':', '')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_generator import build_schools
+from optimizer import (
+    build_routing_model, build_search_params, create_data_model,
+    extract_routes, prepare_critical_df, to_vrp_frame,
+)
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+SIZES = (50, 500, 2000, 10000)
+DENSITIES = {"tight": 0.08, "sparse": 0.8}
+
+# Above this many nodes the dense matrix (and its list copy handed to
+# OR-Tools) no longer fits comfortably; use the k-NN arc model instead.
+DENSE_MAX_NODES = 2500
+NEIGHBORS = 15
+
+# -------------------------------
+# Seeded instances
+# -------------------------------
+def make_instance(num_schools, density, seed=42):
+    return to_vrp_frame(
+        build_schools(num_schools, seed=seed, spread=DENSITIES[density])
+    )
+
+# -------------------------------
+# Phase timing
+# -------------------------------
+class Phases:
+    def __init__(self):
+        self.timings = {}
+        self.peaks = {}
+
+    def run(self, name, fn, *args):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn(*args)
+        self.timings[name] = round(time.perf_counter() - start, 4)
+        self.peaks[name] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result
+
+def run_case(num_schools, density, num_vehicles, time_limit, seed):
+    df = make_instance(num_schools, density, seed)
+    critical_df = prepare_critical_df(df)
+    nodes = len(critical_df)
+
+    neighbors = NEIGHBORS if nodes > DENSE_MAX_NODES else None
+    # Fleet sized so the instance is always capacity-feasible
+    capacity = int(max(
+        np.ceil(critical_df["pending_mbu"].sum() / num_vehicles * 1.2),
+        critical_df["pending_mbu"].max(),
+    ))
+
+    phases = Phases()
+    data = phases.run(
+        "matrix", create_data_model, critical_df, num_vehicles, capacity, neighbors
+    )
+    manager, routing = phases.run("model", build_routing_model, data)
+    search_params = build_search_params(time_limit)
+    solution = phases.run("search", routing.SolveWithParameters, search_params)
+    routes = None
+    if solution:
+        routes = phases.run(
+            "extract", extract_routes, data, manager, routing, solution, critical_df
+        )
+
+    return {
+        "schools": num_schools,
+        "density": density,
+        "nodes": nodes,
+        "vehicles": num_vehicles,
+        "capacity": capacity,
+        "model": f"knn-{neighbors}" if neighbors else "dense",
+        "seconds": phases.timings,
+        "peak_traced_bytes": phases.peaks,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "solved": bool(solution),
+        "route_cost_m": int(routes.distances.sum()) if routes is not None else None,
+    }
+
+# -------------------------------
+# Results (JSON, one file per run)
+# -------------------------------
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Routing engine benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--densities", nargs="+", default=list(DENSITIES),
+                        choices=list(DENSITIES))
+    parser.add_argument("--vehicles", type=int, default=10)
+    parser.add_argument("--time-limit", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    cases = []
+    for size in args.sizes:
+        for density in args.densities:
+            case = run_case(size, density, args.vehicles, args.time_limit, args.seed)
+            print(json.dumps(case))
+            cases.append(case)
+
+    report = {
+        "revision": git_revision(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "time_limit": args.time_limit,
+        "seed": args.seed,
+        "cases": cases,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"routing_{report['created'].replace(':', '')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from optimizer import haversine_matrix, solve_vrp
+
+# -------------------------------
+# Synthetic High-risk instance
+# -------------------------------
+def make_instance(num_schools, seed=42, spread=0.5):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "school_name": [f"School {i}" for i in range(num_schools)],
+        "lat": 13.20 + rng.uniform(-spread, spread, num_schools),
+        "lon": 77.55 + rng.uniform(-spread, spread, num_schools),
+        "pending_mbu": rng.integers(10, 80, num_schools),
+        "risk_level": "High",
+    })
+
+def route_cost(routes):
+    total = 0
+    for route in routes:
+        lat = [stop["lat"] for stop in route]
+        lon = [stop["lon"] for stop in route]
+        m = haversine_matrix(lat, lon)
+        total += int(np.trace(m, offset=1))
+    return total
+
+# -------------------------------
+# Dense vs sparse comparison
+# -------------------------------
+def run(sizes=(200, 500, 1000), k=10, capacity=400):
+    rows = []
+    for n in sizes:
+        df = make_instance(n)
+        vans = int(np.ceil(df["pending_mbu"].sum() / capacity)) + 1
+
+        for label, neighbors in [("dense", None), (f"knn-{k}", k)]:
+            start = time.perf_counter()
+            routes = solve_vrp(df, vans, capacity, neighbors=neighbors)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                "schools": n,
+                "model": label,
+                "seconds": round(elapsed, 3),
+                "routes": len(routes),
+                "cost_km": round(route_cost(routes) / 1000, 1),
+            })
+            print(rows[-1])
+
+    return pd.DataFrame(rows)
+
+if __name__ == "__main__":
+    print(run().to_string(index=False))
@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+
+from forecasting import SILVER_PATH, load_silver, silver_version
+from manifests import read_manifest, write_manifest
+
+# -------------------------------
+# Pre-aggregated drill-down cubes
+# -------------------------------
+# One Parquet file per level of the state -> district -> pincode
+# hierarchy, built once when the silver layer is written. Each cube is
+# sorted on its keys, so a filter change is an index lookup.
+CUBE_DIR = ".cubes"
+LEVELS = ("state", "district", "pincode")
+
+MEASURES = [
+    "clean_0_5", "clean_5_17", "clean_18_plus",
+    "mbu_due_5", "mbu_due_15", "total_pending_mbu",
+]
+
+def build_cubes(silver, directory=CUBE_DIR, version=None):
+    os.makedirs(directory, exist_ok=True)
+    for depth in range(1, len(LEVELS) + 1):
+        keys = list(LEVELS[:depth])
+        cube = silver.groupby(keys, sort=True).agg(
+            records=("date", "size"),
+            first_date=("date", "min"),
+            last_date=("date", "max"),
+            **{m: (m, "sum") for m in MEASURES},
+        )
+        cube.to_parquet(os.path.join(directory, f"{LEVELS[depth - 1]}.parquet"))
+
+    write_manifest(directory, version=version, levels=list(LEVELS))
+
+def ensure_cubes(source=SILVER_PATH, directory=CUBE_DIR):
+    # Rebuilds the cubes only when the silver file has changed
+    version = silver_version(source)
+    if read_manifest(directory).get("version") != version:
+        build_cubes(load_silver(source), directory, version)
+    return version
+
+class DataCube:
+    # Read-side of the cube set: totals for any node of the hierarchy
+    # and the breakdown of its children.
+
+    def __init__(self, cubes):
+        self.cubes = cubes  # level name -> frame indexed by its keys
+
+    @classmethod
+    def load(cls, directory=CUBE_DIR):
+        return cls({
+            level: pd.read_parquet(os.path.join(directory, f"{level}.parquet"))
+            for level in LEVELS
+        })
+
+    def _path(self, state=None, district=None, pincode=None):
+        # Selected keys, stopping at the first level left open
+        path = []
+        for value in (state, district, pincode):
+            if value is None:
+                break
+            path.append(value)
+        return tuple(path)
+
+    def options(self, state=None, district=None):
+        # Values available one level below the selection
+        return self.children(state, district).index.tolist()
+
+    def children(self, state=None, district=None):
+        path = self._path(state, district)
+        cube = self.cubes[LEVELS[len(path)]]
+        if not path:
+            return cube
+        return cube.loc[path if len(path) > 1 else path[0]]
+
+    def totals(self, state=None, district=None, pincode=None):
+        path = self._path(state, district, pincode)
+        if not path:
+            cube = self.cubes[LEVELS[0]]
+            totals = cube[["records"] + MEASURES].sum()
+            totals["first_date"] = cube["first_date"].min()
+            totals["last_date"] = cube["last_date"].max()
+            return totals
+        cube = self.cubes[LEVELS[len(path) - 1]]
+        return cube.loc[path if len(path) > 1 else path[0]]
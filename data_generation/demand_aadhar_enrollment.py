@@ -2,6 +2,10 @@ import requests
 import pandas as pd
 import time
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cubes import ensure_cubes
 
 # Configuration
 API_KEY = "579b464db66ec23bdd000001f251a4cb0a0d44cb62aa1ed59941aff4"
@@ -115,6 +119,10 @@ def fetch_demo_data():
     # Save to CSV
     df.to_csv("aadhaar_silver_layer_demo.csv", index=False)
     print("[Silver Layer] Derived data saved to 'aadhaar_silver_layer_demo.csv'")
+
+    # Drill-down cubes for the dashboard (state -> district -> pincode)
+    ensure_cubes("aadhaar_silver_layer_demo.csv")
+    print("[Gold Layer] Drill-down cubes saved to '.cubes/'")
     
     return df
 
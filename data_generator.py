@@ -2,8 +2,10 @@ import pandas as pd
 import numpy as np
 import random
 
-def generate_data(num_schools=100):
-    print("🔄 Generating synthetic government school data...")
+def build_schools(num_schools=100, seed=None, spread=0.08):
+    # seed makes the draw reproducible; spread is the max lat/lon offset
+    # from the district centre (0.08 ~ one rural district).
+    rng = random.Random(seed)
 
     # Center coordinates (Bangalore Rural context)
     base_lat = 13.20
@@ -32,18 +34,18 @@ def generate_data(num_schools=100):
 
     for i in range(1, num_schools + 1):
         # 1. Create Realistic Location (Clustered)
-        lat_offset = random.uniform(-0.08, 0.08)
-        lon_offset = random.uniform(-0.08, 0.08)
+        lat_offset = rng.uniform(-spread, spread)
+        lon_offset = rng.uniform(-spread, spread)
 
         # 2. Generate Core Metrics
         # Backlog: How many students need updates (10 to 300)
-        if random.random() < 0.2:
-            backlog = random.randint(150, 400)
+        if rng.random() < 0.2:
+            backlog = rng.randint(150, 400)
         else:
-            backlog = random.randint(10, 80)
+            backlog = rng.randint(10, 80)
 
         # Gender Parity Index (GPI)
-        gpi = round(random.uniform(0.65, 1.1), 2)
+        gpi = round(rng.uniform(0.65, 1.1), 2)
 
         # 3. Calculate Priority Score
         norm_backlog = min(backlog / 400, 1.0)
@@ -60,20 +62,24 @@ def generate_data(num_schools=100):
 
         school = {
             "school_id": f"SCH-{1000+i}",
-            "school_name": f"{random.choice(prefixes)}, {random.choice(towns)} Block-{random.randint(1,9)}",
+            "school_name": f"{rng.choice(prefixes)}, {rng.choice(towns)} Block-{rng.randint(1,9)}",
             "latitude": round(base_lat + lat_offset, 6),
             "longitude": round(base_lon + lon_offset, 6),
             "backlog_students": backlog,
             "gender_parity_index": gpi,
             "priority_score": priority_score,
             "status": status,
-            "contact_number": f"+91-98{random.randint(10000000, 99999999)}"
+            "contact_number": f"+91-98{rng.randint(10000000, 99999999)}"
         }
 
         schools_data.append(school)
 
-    # Create DataFrame
-    df = pd.DataFrame(schools_data)
+    return pd.DataFrame(schools_data)
+
+def generate_data(num_schools=100):
+    print("🔄 Generating synthetic government school data...")
+
+    df = build_schools(num_schools)
 
     # Save to CSV
     filename = "mock_school_data.csv"
@@ -0,0 +1,205 @@
+import csv
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    from fpdf import FPDF
+except ImportError:
+    FPDF = None
+
+# -------------------------------
+# Driver manifest export
+# -------------------------------
+# Files are written straight from a RouteSet's flat arrays, one van at a
+# time, into EXPORT_DIR under a digest of the solved routes; a second
+# download of the same plan reads the finished file. Nothing builds a full manifest
+# frame or an in-memory copy of the document first.
+EXPORT_DIR = ".exports"
+MAX_EXPORTS = 64  # files kept, oldest removed first
+
+# (frame column, header); columns missing from the plan are skipped
+MANIFEST_COLUMNS = [
+    ("school_id", "School ID"),
+    ("school_name", "School"),
+    ("pending_mbu", "Planned Updates"),
+    ("priority_score", "Priority"),
+    ("contact_number", "Contact"),
+    ("lat", "Latitude"),
+    ("lon", "Longitude"),
+]
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+def _columns(routes):
+    columns = [(col, header) for col, header in MANIFEST_COLUMNS if col in routes.frame]
+    # Column arrays are taken once; rows are read by node index
+    values = [routes.frame[col].to_numpy() for col, _ in columns]
+    # float32 register columns, widened so files keep short decimals
+    values = [v.astype(np.float64).round(6) if v.dtype == np.float32 else v for v in values]
+    headers = ["Stop"] + [header for _, header in columns]
+    if routes.arrivals is not None:
+        headers.append("Arrival")
+    return headers, values
+
+def iter_vans(routes):
+    # (route label, distance_m, load, stop positions) per route that
+    # visits at least one school; depot rows at both ends are dropped.
+    # Vans running several trips get one label per trip.
+    for r, (vehicle, trip) in enumerate(zip(routes.vehicle_ids, routes.trips)):
+        start, stop = routes.offsets[r] + 1, routes.offsets[r + 1] - 1
+        if stop > start:
+            label = f"Van-{vehicle + 1}" + (f" (trip {trip})" if trip > 1 else "")
+            yield label, int(routes.distances[r]), int(routes.loads[r]), range(start, stop)
+
+def iter_rows(routes, positions, values):
+    # One van's columns are gathered at a time (tolist gives plain
+    # Python values for the writers), then yielded row by row.
+    nodes = routes.nodes[positions.start:positions.stop]
+    columns = [np.arange(1, len(nodes) + 1).tolist()]
+    columns += [v[nodes].tolist() for v in values]
+    if routes.arrivals is not None:
+        minutes = routes.arrivals[positions.start:positions.stop].tolist()
+        columns.append([f"{m // 60:02d}:{m % 60:02d}" for m in minutes])
+    yield from zip(*columns)
+
+# -------------------------------
+# Writers
+# -------------------------------
+def write_csv(routes, path):
+    headers, values = _columns(routes)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Van"] + headers)
+        for van, _, _, positions in iter_vans(routes):
+            writer.writerows((van,) + row for row in iter_rows(routes, positions, values))
+
+def write_xlsx(routes, path):
+    # constant_memory flushes each row to disk as it is written
+    if xlsxwriter is None:
+        raise RuntimeError("XLSX export needs the xlsxwriter package")
+
+    headers, values = _columns(routes)
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    bold = workbook.add_format({"bold": True, "bg_color": "#FFF5EB"})
+
+    summary = workbook.add_worksheet("Summary")
+    summary.write_row(0, 0, ["Van", "Stops", "Planned Updates", "Distance (km)"], bold)
+    vans = list(iter_vans(routes))
+    for i, (van, distance, load, positions) in enumerate(vans, start=1):
+        summary.write_row(i, 0, [van, len(positions), load, round(distance / 1000, 2)])
+
+    for van, _, _, positions in vans:
+        sheet = workbook.add_worksheet(van)
+        sheet.write_row(0, 0, headers, bold)
+        sheet.freeze_panes(1, 0)
+        for i, row in enumerate(iter_rows(routes, positions, values), start=1):
+            sheet.write_row(i, 0, row)
+
+    workbook.close()
+
+def write_pdf(routes, path):
+    # Monospaced rows, one text cell each: fpdf2 cost grows with the
+    # number of cells, so per-value cells would be ~10x slower.
+    if FPDF is None:
+        raise RuntimeError("PDF export needs the fpdf2 package")
+
+    headers, values = _columns(routes)
+    widths = {"Stop": 5, "School": 44, "School ID": 10, "Contact": 15, "Arrival": 7}
+    col_widths = [widths.get(h, 11) for h in headers]
+
+    def line(row):
+        text = " ".join(str(v)[:w].ljust(w) for v, w in zip(row, col_widths))
+        return text.encode("latin-1", "replace").decode("latin-1")
+
+    pdf = FPDF(orientation="L", format="A4")
+    pdf.set_auto_page_break(True, margin=12)
+
+    def header_row():
+        pdf.set_font("Courier", "B", 8)
+        pdf.set_fill_color(255, 245, 235)
+        pdf.cell(0, 5, line(headers), border="B", fill=True, new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Courier", size=8)
+
+    for van, distance, load, positions in iter_vans(routes):
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, f"{van} - Driver Manifest", new_x="LMARGIN", new_y="NEXT")
+        pdf.set_font("Helvetica", size=9)
+        pdf.cell(
+            0, 6, f"{len(positions)} stops - {load} planned updates - {distance / 1000:,.1f} km",
+            new_x="LMARGIN", new_y="NEXT"
+        )
+        pdf.ln(2)
+        header_row()
+        for row in iter_rows(routes, positions, values):
+            if pdf.will_page_break(4.5):
+                pdf.add_page()
+                header_row()
+            pdf.cell(0, 4.5, line(row), new_x="LMARGIN", new_y="NEXT")
+
+    pdf.output(path)
+
+WRITERS = {"csv": write_csv, "xlsx": write_xlsx, "pdf": write_pdf}
+
+# -------------------------------
+# Cached exports
+# -------------------------------
+def routes_digest(routes):
+    # Hash of the solved plan itself (stops, route bounds, vans and the
+    # frame they index), not of the solve inputs: a time-limited search
+    # can return a different plan for the same inputs.
+    digest = hashlib.sha256()
+    for array in (routes.nodes, routes.offsets, routes.vehicle_ids):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(pd.util.hash_pandas_object(routes.frame, index=False).to_numpy().tobytes())
+    digest.update(",".join(map(str, routes.frame.columns)).encode())
+    return digest.hexdigest()
+
+def export_path(digest, fmt, directory=EXPORT_DIR):
+    return os.path.join(directory, f"{digest}.{fmt}")
+
+def export_manifest(routes, fmt, directory=EXPORT_DIR):
+    # Path of the manifest file, written on first request
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {sorted(WRITERS)}")
+
+    path = export_path(routes_digest(routes), fmt, directory)
+    if os.path.exists(path):
+        os.utime(path)  # refresh LRU position
+        return path
+
+    # Unique temp name per writer, so concurrent downloads of the same
+    # plan (threads of one process included) never share a file
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        WRITERS[fmt](routes, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    _trim(directory)
+    return path
+
+def _trim(directory, max_files=MAX_EXPORTS):
+    entries = sorted(
+        (entry.stat().st_mtime, entry.path)
+        for entry in os.scandir(directory)
+        if entry.name.split(".")[-1] in WRITERS
+    )
+    for _, path in entries[:-max_files]:
+        os.remove(path)
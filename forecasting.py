@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# District backlog forecasting
+# -------------------------------
+# Fitted from the silver layer (one row per pincode and date). Every
+# district is fitted at once on a dates x districts demand matrix.
+SILVER_PATH = "aadhaar_silver_layer_demo.csv"
+DATE_FORMAT = "%d-%m-%Y"
+
+ROLLING_DAYS = 28  # window for the demand level and its trend
+SEASONALITY_PRIOR_DAYS = 30  # shrinks thin months toward an index of 1
+FORECAST_HORIZON = 30  # days
+
+def silver_version(path=SILVER_PATH):
+    # Cheap data version for cache keys: changes whenever the file does
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def load_silver(path=SILVER_PATH):
+    silver = pd.read_csv(path)
+    silver["date"] = pd.to_datetime(silver["date"], format=DATE_FORMAT)
+    return silver
+
+def demand_matrix(silver, value="total_pending_mbu"):
+    # Daily new demand per (state, district); days without records are 0
+    matrix = silver.pivot_table(
+        index="date", columns=["state", "district"], values=value,
+        aggfunc="sum", fill_value=0
+    )
+    days = pd.date_range(matrix.index.min(), matrix.index.max(), freq="D")
+    return matrix.reindex(days, fill_value=0).astype(float)
+
+class DemandForecast:
+    # Per district:
+    #   level       rolling-average daily demand (MBUs/day)
+    #   velocity    least-squares trend of that average (MBUs/day per day)
+    #   seasonality month-of-year index (1 = average month)
+    #   backlog     pending MBUs on last_date
+    # project() rolls the backlog forward under a daily fleet capacity;
+    # it and summary() count days from the same start (last_date).
+
+    def __init__(self, districts, level, velocity, seasonality, backlog, last_date):
+        self.districts = districts  # MultiIndex (state, district)
+        self.level = level
+        self.velocity = velocity
+        self.seasonality = seasonality  # 12 x districts
+        self.backlog = backlog
+        self.last_date = last_date
+
+    @classmethod
+    def fit(cls, silver, window=ROLLING_DAYS):
+        demand = demand_matrix(silver)
+        values = demand.to_numpy()
+
+        rolling = demand.rolling(window, min_periods=1).mean().to_numpy()
+        level = rolling[-1]
+
+        # Slope of the rolling average over the last window, all districts at once
+        recent = rolling[-window:]
+        t = np.arange(len(recent), dtype=float)
+        t -= t.mean()
+        velocity = t @ (recent - recent.mean(axis=0)) / max((t ** 2).sum(), 1)
+
+        # Month means over the overall mean, shrunk toward 1 by prior days
+        months = demand.index.month.to_numpy() - 1
+        month_sum = np.zeros((12, values.shape[1]))
+        np.add.at(month_sum, months, values)
+        month_days = np.bincount(months, minlength=12)[:, None]
+        mean = values.mean(axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            seasonality = (month_sum + SEASONALITY_PRIOR_DAYS * mean) / (
+                (month_days + SEASONALITY_PRIOR_DAYS) * mean
+            )
+        seasonality[:, mean == 0] = 1.0
+
+        backlog = silver.groupby(["state", "district"])["total_pending_mbu"].sum()
+        backlog = backlog.reindex(demand.columns, fill_value=0).to_numpy()
+
+        return cls(demand.columns, level, velocity, seasonality, backlog, demand.index[-1])
+
+    def forecast_days(self, horizon=FORECAST_HORIZON, start=None):
+        # start (default last_date, the day the backlog and trend
+        # describe) followed by the horizon projected days
+        start = self.last_date if start is None else pd.Timestamp(start).normalize()
+        return pd.date_range(start, periods=horizon + 1, freq="D")
+
+    def summary(self, horizon=FORECAST_HORIZON, start=None):
+        # seasonality: mean index over the days project() covers
+        months = self.forecast_days(horizon, start).month.to_numpy()[1:] - 1
+        return pd.DataFrame({
+            "rolling_demand": self.level,
+            "velocity": self.velocity,
+            "seasonality": self.seasonality[months].mean(axis=0),
+            "backlog": self.backlog,
+        }, index=self.districts)
+
+    def project(self, daily_capacity, horizon=FORECAST_HORIZON, start=None):
+        # Net backlog per district for each of the next horizon days if
+        # that district gets the whole daily_capacity. Returns a
+        # (horizon + 1) x districts frame; row 0 is the start date.
+        days = self.forecast_days(horizon, start)
+
+        steps = np.arange(1, horizon + 1)[:, None]
+        trend = np.maximum(self.level + self.velocity * steps, 0)
+        inflow = trend * self.seasonality[days.month.to_numpy()[1:] - 1]
+
+        backlog = np.empty((horizon + 1, len(self.backlog)))
+        backlog[0] = self.backlog
+        for day in range(horizon):
+            backlog[day + 1] = np.maximum(backlog[day] + inflow[day] - daily_capacity, 0)
+
+        return pd.DataFrame(backlog, index=days, columns=self.districts)
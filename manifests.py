@@ -0,0 +1,33 @@
+import json
+import os
+import tempfile
+
+# -------------------------------
+# Derived-file manifests
+# -------------------------------
+# Directories of files built from a source (drill-down cubes, school
+# sidecars) carry a manifest.json naming the version they were built
+# from. It is written after the files, so a set without one is never
+# trusted and gets rebuilt.
+MANIFEST_NAME = "manifest.json"
+
+def read_manifest(directory):
+    # {} when missing or unreadable
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def write_manifest(directory, **fields):
+    # Call only once the files it describes are in place. Each writer
+    # (threads included) gets its own mkstemp temp file.
+    path = os.path.join(directory, MANIFEST_NAME)
+    fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(fields, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
@@ -0,0 +1,134 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+try:
+    import h3  # optional: H3 cells instead of the built-in hex grid
+except ImportError:
+    h3 = None
+
+# -------------------------------
+# Dashboard map data
+# -------------------------------
+# Everything the browser needs is precomputed here with NumPy, so deck.gl
+# reads plain fields instead of evaluating accessor expressions per
+# point, and only those fields are serialized.
+#
+# The payload is still row-oriented JSON: st.pydeck_chart ships
+# Deck.to_json(), and pydeck's binary (typed-array) transport is Jupyter
+# only and disabled in pydeck 0.9. Short keys, rounded coordinates and
+# hex bins above MAX_POINTS are what keep it small instead.
+EARTH_RADIUS_M = 6_371_000
+
+# Above this many schools, or below this zoom, the map shows hex bins
+MAX_POINTS = 20_000
+HEX_ZOOM = 9
+HEX_RADIUS_PX = 20  # on-screen hex size at the view's zoom
+
+COORD_DECIMALS = 5  # ~1 m; keeps the JSON short
+
+def priority_colors(priority):
+    # Same ramp as before: red (high priority) to yellow (low)
+    priority = np.clip(np.asarray(priority, dtype=np.float32), 0, 1)
+    colors = np.zeros((len(priority), 3), dtype=np.uint8)
+    colors[:, 0] = 255
+    colors[:, 1] = ((1 - priority) * 255).astype(np.uint8)
+    return colors
+
+def school_points(df):
+    # One row per school with short keys: pos [lon, lat], c [r, g, b],
+    # n name, b backlog (also the radius). Rows, not columns: deck.gl
+    # reads JSON data as an array of objects (see above).
+    pos = np.column_stack([df["longitude"], df["latitude"]]).astype(np.float32)
+    return pd.DataFrame({
+        "pos": np.round(pos.astype(float), COORD_DECIMALS).tolist(),
+        "c": priority_colors(df["priority_score"]).tolist(),
+        "n": df["school_name"].to_numpy(),
+        "b": df["backlog_students"].to_numpy(),
+    })
+
+# -------------------------------
+# View fitting
+# -------------------------------
+def fit_view(lat, lon, width_px=800):
+    # Centre and web-mercator zoom that fit the points' bounding box
+    lat = np.asarray(lat, dtype=float)
+    lon = np.asarray(lon, dtype=float)
+    span = max(np.ptp(lon), np.ptp(lat) / max(math.cos(math.radians(lat.mean())), 0.1), 1e-4)
+    zoom = math.log2(360 * width_px / 256 / (span * 1.2))
+    return float(lat.mean()), float(lon.mean()), float(np.clip(zoom, 3, 14))
+
+def metres_per_pixel(lat, zoom):
+    return 156_543.03 * math.cos(math.radians(lat)) / 2 ** zoom
+
+def use_hex_bins(num_points, zoom):
+    return num_points > MAX_POINTS or zoom < HEX_ZOOM
+
+# -------------------------------
+# Server-side hex aggregation
+# -------------------------------
+def _hex_axial(lat, lon, radius_m):
+    # Pointy-top hex grid over an equirectangular projection; returns
+    # the axial (q, r) cell of each point via cube rounding.
+    lat0 = math.radians(float(np.mean(lat)))
+    x = np.radians(lon) * math.cos(lat0) * EARTH_RADIUS_M
+    y = np.radians(lat) * EARTH_RADIUS_M
+
+    q = (math.sqrt(3) / 3 * x - y / 3) / radius_m
+    r = (2 / 3 * y) / radius_m
+    s = -q - r
+
+    rq, rr, rs = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    rq = np.where(fix_q, -rr - rs, rq)
+    rr = np.where(fix_r, -rq - rs, rr)
+    return rq.astype(np.int64), rr.astype(np.int64), lat0
+
+def _hex_center(q, r, radius_m, lat0):
+    x = radius_m * math.sqrt(3) * (q + r / 2)
+    y = radius_m * 1.5 * r
+    lat = np.degrees(y / EARTH_RADIUS_M)
+    lon = np.degrees(x / (EARTH_RADIUS_M * math.cos(lat0)))
+    return lat, lon
+
+def h3_resolution(radius_m):
+    # Finest H3 resolution whose average edge is at least radius_m
+    edge_km_res0 = 1107.71
+    res = math.log(edge_km_res0 * 1000 / radius_m) / math.log(math.sqrt(7))
+    return int(np.clip(math.floor(res), 0, 15))
+
+def hex_bins(df, radius_m):
+    # Schools, backlog and mean priority per hex cell. With h3 installed
+    # cells are H3 ids (column "hex"); otherwise centres in "pos".
+    lat = df["latitude"].to_numpy(dtype=float)
+    lon = df["longitude"].to_numpy(dtype=float)
+    values = pd.DataFrame({
+        "backlog": df["backlog_students"].to_numpy(),
+        "priority": df["priority_score"].to_numpy(dtype=float),
+    })
+
+    if h3 is not None:
+        res = h3_resolution(radius_m)
+        values["hex"] = [h3.latlng_to_cell(a, b, res) for a, b in zip(lat, lon)]
+        keys = ["hex"]
+    else:
+        values["q"], values["r"], lat0 = _hex_axial(lat, lon, radius_m)
+        keys = ["q", "r"]
+
+    bins = values.groupby(keys, sort=False).agg(
+        schools=("backlog", "size"),
+        backlog=("backlog", "sum"),
+        priority=("priority", "mean"),
+    ).reset_index()
+
+    if h3 is None:
+        center_lat, center_lon = _hex_center(bins["q"].to_numpy(), bins["r"].to_numpy(), radius_m, lat0)
+        bins["pos"] = np.round(np.column_stack([center_lon, center_lat]), COORD_DECIMALS).tolist()
+        bins = bins.drop(columns=["q", "r"])
+
+    bins["c"] = priority_colors(bins["priority"]).tolist()
+    bins["priority"] = bins["priority"].round(2)
+    return bins
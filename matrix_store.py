@@ -0,0 +1,137 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+from optimizer import MATRIX_BLOCK_ROWS, _haversine_m
+
+# -------------------------------
+# Memory-mapped distance matrix store
+# -------------------------------
+# Matrices are .npy files keyed by the node coordinates; every solver
+# process opens them with mmap_mode="r", so one copy lives in the page
+# cache no matter how many workers use it.
+MATRIX_STORE_DIR = ".matrix_store"
+
+# dtype -> largest storable value; int32 metres covers any pair on Earth,
+# uint16 needs scale=10 (decametres) and stops at ~655 km. A pair past
+# the limit is an error: clamping would make far pairs look cheap.
+DTYPE_LIMITS = {
+    np.dtype(np.int32): np.iinfo(np.int32).max,
+    np.dtype(np.uint32): np.iinfo(np.uint32).max,
+    np.dtype(np.uint16): np.iinfo(np.uint16).max,
+}
+
+class MatrixStore:
+    # Content-addressed store of compact (int32 metres by default)
+    # distance matrices persisted as memory-mapped .npy files.
+
+    def __init__(self, directory=MATRIX_STORE_DIR, dtype=np.int32, scale=1):
+        self.directory = directory
+        self.dtype = np.dtype(dtype)
+        self.scale = scale  # metres per stored unit
+        if self.dtype not in DTYPE_LIMITS:
+            raise ValueError(
+                f"Unsupported matrix dtype {self.dtype}; expected one of "
+                f"{sorted(str(d) for d in DTYPE_LIMITS)}"
+            )
+
+    def key(self, lat, lon):
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(lat, dtype=float).tobytes())
+        digest.update(np.ascontiguousarray(lon, dtype=float).tobytes())
+        digest.update(f"{self.dtype.str}:{self.scale}".encode())
+        return digest.hexdigest()
+
+    def path(self, lat, lon):
+        return os.path.join(self.directory, f"{self.key(lat, lon)}.npy")
+
+    def get(self, lat, lon, block_rows=MATRIX_BLOCK_ROWS):
+        # Read-only memmap of the haversine matrix, built block by block
+        # straight into the file on first use.
+        path = self.path(lat, lon)
+        if not os.path.exists(path):
+            self._build(path, lat, lon, block_rows)
+        return np.load(path, mmap_mode="r")
+
+    def _build(self, path, lat, lon, block_rows):
+        lat = np.radians(np.asarray(lat, dtype=float))
+        lon = np.radians(np.asarray(lon, dtype=float))
+        size = len(lat)
+        limit = DTYPE_LIMITS[self.dtype]
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        os.close(fd)
+        out = np.lib.format.open_memmap(
+            tmp, mode="w+", dtype=self.dtype, shape=(size, size)
+        )
+
+        step = max(block_rows or size, 1)
+        try:
+            for start in range(0, size, step):
+                stop = min(start + step, size)
+                block = _haversine_m(
+                    lat[start:stop, None], lon[start:stop, None],
+                    lat[None, :], lon[None, :]
+                ) // self.scale
+                if block.max(initial=0) > limit:
+                    raise ValueError(
+                        f"A {block.max() * self.scale / 1000:,.0f} km pair does not fit "
+                        f"{self.dtype} at scale={self.scale} (max {limit * self.scale / 1000:,.0f} km); "
+                        "use a wider dtype or a larger scale"
+                    )
+                out[start:stop] = block
+            out.flush()
+        except BaseException:
+            del out
+            os.remove(tmp)
+            raise
+
+        del out
+        os.replace(tmp, path)
+
+# -------------------------------
+# Zero-copy sub-matrices
+# -------------------------------
+class SubMatrix:
+    # Matrix restricted to a subset of nodes without copying the base:
+    # sub[i, j] reads base[nodes[i], nodes[j]]. Materialise with
+    # np.asarray(sub) only when a dense copy is really needed.
+
+    def __init__(self, base, nodes):
+        self.base = base
+        self.nodes = np.asarray(nodes, dtype=np.int64)
+        self.shape = (len(self.nodes), len(self.nodes))
+        self.dtype = base.dtype
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            i, j = key
+            rows, cols = self.nodes[i], self.nodes[j]
+            if isinstance(i, slice) or isinstance(j, slice):
+                # A slice selects the whole block, as on a dense array
+                block = self.base[np.ix_(np.atleast_1d(rows), np.atleast_1d(cols))]
+                return block.reshape(rows.shape + cols.shape)
+            # Scalars and paired index arrays read pointwise
+            return self.base[rows, cols]
+        return self.base[self.nodes[key]][..., self.nodes]
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self.base[np.ix_(self.nodes, self.nodes)]
+        return dense if dtype is None else dense.astype(dtype)
+
+    def tolist(self):
+        return np.asarray(self).tolist()
+
+def submatrix(matrix, nodes):
+    # Contiguous node ranges are plain NumPy views; anything else gets a
+    # SubMatrix index view over the same buffer.
+    nodes = np.asarray(nodes, dtype=np.int64)
+    if len(nodes) and np.array_equal(nodes, np.arange(nodes[0], nodes[0] + len(nodes))):
+        return matrix[nodes[0]:nodes[0] + len(nodes), nodes[0]:nodes[0] + len(nodes)]
+    return SubMatrix(matrix, nodes)
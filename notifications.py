@@ -0,0 +1,281 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+
+# -------------------------------
+# Parent notification dispatch
+# -------------------------------
+# Recipients are batched and sent through a pluggable gateway with
+# bounded concurrency, a per-gateway rate limit and retries. Dispatch
+# runs on its own event loop thread so the Streamlit script never waits.
+DEFAULT_MESSAGE = "Aadhaar Camp at your school tomorrow."
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+class GatewayError(Exception):
+    # Raised by a gateway for a whole batch; retryable errors (timeouts,
+    # throttling, 5xx) are retried with backoff, others fail the batch.
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+# -------------------------------
+# Recipients
+# -------------------------------
+def normalize_number(raw, country_code="91"):
+    # "+91-98xxxxxxxx", "098xxxxxxxx", "98xxxxxxxx" -> "+9198xxxxxxxx"
+    digits = re.sub(r"\D", "", str(raw))
+    if len(digits) == 10:
+        digits = country_code + digits
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = country_code + digits[1:]
+    if len(digits) != 10 + len(country_code) or not digits.startswith(country_code):
+        return None
+    return "+" + digits
+
+def build_recipients(df, status="CRITICAL", column="contact_number"):
+    # Unique, normalized numbers of the schools with the given status,
+    # in frame order; unparseable numbers are dropped.
+    numbers = df.loc[df["status"] == status, column].dropna()
+    recipients = {}
+    for raw in numbers:
+        number = normalize_number(raw)
+        if number:
+            recipients[number] = None
+    return list(recipients)
+
+def batched(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# -------------------------------
+# Rate limiting
+# -------------------------------
+# Both limits live on the gateway, so every broadcast sharing it (one
+# event loop per BroadcastJob thread) draws from the same budget. They
+# use thread locks, not asyncio primitives, which are per-loop.
+class RateLimiter:
+    # Token bucket: at most rate calls per second, bursts up to burst
+    def __init__(self, rate, burst=None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        # Takes a token, going into debt if none is left; returns how
+        # long the caller must wait for its token to exist
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+class ConcurrencyLimit:
+    # At most limit calls in flight across threads and event loops
+    POLL_S = 0.01
+
+    def __init__(self, limit):
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+        self._slots = threading.BoundedSemaphore(limit)
+
+    async def __aenter__(self):
+        # Polled: a blocking acquire would stall this thread's event loop
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(self.POLL_S)
+
+    async def __aexit__(self, *exc):
+        self._slots.release()
+
+# -------------------------------
+# Gateways
+# -------------------------------
+class Gateway:
+    # Base for pluggable gateways: batch size and the shared limits.
+    # Subclasses implement async send_batch(numbers, message) and return
+    # the numbers the provider rejected.
+    name = "gateway"
+
+    def __init__(self, batch_size=100, rate_per_sec=10, max_concurrency=8):
+        self.batch_size = batch_size
+        self.rate_per_sec = rate_per_sec  # batches per second
+        self.max_concurrency = max_concurrency
+        self.limiter = RateLimiter(rate_per_sec)
+        self.slots = ConcurrencyLimit(max_concurrency)
+
+class StubGateway(Gateway):
+    # Local stand-in for an SMS provider: simulated latency and random
+    # batch failures. delivered keeps the last max_delivered numbers
+    # (the gateway is shared by every session); delivered_count all.
+    name = "stub"
+
+    def __init__(self, latency=0.05, failure_rate=0.0, seed=None, batch_size=100,
+                 rate_per_sec=50, max_concurrency=16, max_delivered=10_000):
+        super().__init__(batch_size, rate_per_sec, max_concurrency)
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self.delivered = deque(maxlen=max_delivered)
+        self.delivered_count = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    async def send_batch(self, numbers, message):
+        with self._lock:
+            self.calls += 1
+            fail = self._random.random() < self.failure_rate
+        await asyncio.sleep(self.latency)
+        if fail:
+            raise GatewayError("stub gateway: simulated timeout")
+        with self._lock:
+            self.delivered.extend(numbers)
+            self.delivered_count += len(numbers)
+        return []  # numbers the gateway rejected
+
+class WebhookGateway(Gateway):
+    # Posts {"to": [...], "message": ...} as JSON to an HTTP endpoint,
+    # e.g. a provider's bulk-SMS API. Expects {"rejected": [...]} back.
+    name = "webhook"
+
+    def __init__(self, url, headers=None, timeout=10, batch_size=100,
+                 rate_per_sec=10, max_concurrency=8):
+        super().__init__(batch_size, rate_per_sec, max_concurrency)
+        self.url = url
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    def _post(self, numbers, message):
+        body = json.dumps({"to": numbers, "message": message}).encode()
+        request = urllib.request.Request(self.url, body, self.headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read() or b"{}").get("rejected", [])
+        except urllib.error.HTTPError as exc:
+            raise GatewayError(f"HTTP {exc.code}", retryable=exc.code == 429 or exc.code >= 500)
+        except (urllib.error.URLError, TimeoutError) as exc:
+            raise GatewayError(str(exc))
+
+    async def send_batch(self, numbers, message):
+        # urllib blocks, so each request gets a worker thread
+        return await asyncio.to_thread(self._post, numbers, message)
+
+# -------------------------------
+# Dispatch job
+# -------------------------------
+class BroadcastJob:
+    # One broadcast; counters are updated from the dispatch thread and
+    # read through status() by the UI.
+
+    def __init__(self, recipients, message, gateway, max_retries=MAX_RETRIES,
+                 backoff=RETRY_BACKOFF):
+        self.recipients = recipients
+        self.message = message
+        self.gateway = gateway
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.state = PENDING
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.failed_numbers = []
+        self.error = None
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def total(self):
+        return len(self.recipients)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        self.started = time.time()
+        self.state = RUNNING
+        try:
+            asyncio.run(self.dispatch())
+            self.state = DONE
+        except Exception as exc:  # surfaced through status()
+            self.error = str(exc)
+            self.state = FAILED
+        finally:
+            self.finished = time.time()
+
+    async def dispatch(self):
+        gateway = self.gateway
+
+        async def send(batch):
+            async with gateway.slots:
+                for attempt in range(self.max_retries + 1):
+                    await gateway.limiter.acquire()
+                    try:
+                        rejected = await gateway.send_batch(batch, self.message)
+                    except GatewayError as exc:
+                        if not exc.retryable or attempt == self.max_retries:
+                            self._record(0, batch)
+                            return
+                        with self._lock:
+                            self.retries += 1
+                        await asyncio.sleep(self.backoff * 2 ** attempt)
+                    else:
+                        self._record(len(batch) - len(rejected), rejected)
+                        return
+
+        await asyncio.gather(*(
+            send(batch) for batch in batched(self.recipients, gateway.batch_size)
+        ))
+
+    def _record(self, sent, failed_numbers):
+        with self._lock:
+            self.sent += sent
+            self.failed += len(failed_numbers)
+            self.failed_numbers.extend(failed_numbers)
+
+    def status(self):
+        with self._lock:
+            done = self.sent + self.failed
+            elapsed = 0.0
+            if self.started:
+                elapsed = (self.finished or time.time()) - self.started
+            return {
+                "state": self.state,
+                "gateway": self.gateway.name,
+                "total": self.total,
+                "sent": self.sent,
+                "failed": self.failed,
+                "retries": self.retries,
+                "progress": done / self.total if self.total else 1.0,
+                "elapsed": elapsed,
+                "throughput": done / elapsed if elapsed else 0.0,
+                "error": self.error,
+            }
+
+def broadcast(df, gateway, message=DEFAULT_MESSAGE, **job_kwargs):
+    # Starts a background broadcast to the critical schools' contacts
+    return BroadcastJob(build_recipients(df), message, gateway, **job_kwargs).start()
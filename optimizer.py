@@ -1,9 +1,21 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
 import pandas as pd
 import numpy as np
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
+from scipy.spatial import cKDTree
 from math import radians, cos, sin, asin, sqrt
 
+try:
+    import resource  # peak RSS; POSIX only
+except ImportError:
+    resource = None
+
 # -------------------------------
 # Distance calculation (Haversine)
 # -------------------------------
@@ -16,26 +28,163 @@ def haversine(lon1, lat1, lon2, lat2):
     r = 6371  # km
     return c * r
 
+# -------------------------------
+# Vectorized distance matrix (Haversine)
+# -------------------------------
+# Rows computed per block; bounds the float64 temporaries to
+# block_rows x n instead of n x n on large instances.
+MATRIX_BLOCK_ROWS = 1024
+
+def _haversine_m(lat1, lon1, lat2, lon2):
+    # Radians in, integer metres out. Same operation order as
+    # haversine() so the truncated values match the scalar version.
+    dlon = lon2 - lon1
+    dlat = lat2 - lat1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arcsin(np.sqrt(a))
+    return (c * 6371 * 1000).astype(int)
+
+def haversine_matrix(lat, lon, block_rows=MATRIX_BLOCK_ROWS, out=None):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    size = len(lat)
+
+    # int32 metres: half the memory of int64, still exact for any pair
+    if out is None:
+        out = np.empty((size, size), dtype=np.int32)
+
+    step = max(block_rows or size, 1)
+    for start in range(0, size, step):
+        stop = min(start + step, size)
+        out[start:stop] = _haversine_m(
+            lat[start:stop, None], lon[start:stop, None],
+            lat[None, :], lon[None, :]
+        )
+
+    return out
+
+# -------------------------------
+# Sparse k-nearest-neighbour arcs
+# -------------------------------
+# Cost of an arc outside the neighbour graph. Large enough that the
+# solver only uses one when no neighbour arc keeps the plan feasible.
+SPARSE_BIG_M = 10_000_000  # 10,000 km in metres
+
+def knn_arcs(lat, lon, k):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    size = len(lat)
+    k = min(k, size - 1)
+
+    # Equirectangular projection keeps KD-tree neighbours close to
+    # great-circle neighbours at district/state scale.
+    xy = np.column_stack([lon * np.cos(lat.mean()), lat])
+    _, idx = cKDTree(xy).query(xy, k=k + 1)
+
+    src = np.repeat(np.arange(size), k)
+    dst = idx[:, 1:].ravel()
+
+    # Symmetric neighbour graph: j near i allows both i->j and j->i
+    src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+    keys = np.unique(src * size + dst)
+    src, dst = keys // size, keys % size
+
+    dist = _haversine_m(lat[src], lon[src], lat[dst], lon[dst])
+    return dict(zip(keys.tolist(), dist.tolist()))
+
+def depot_distances(lat, lon, depot=0):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return _haversine_m(lat[depot], lon[depot], lat, lon)
+
+# -------------------------------
+# Time windows (CVRPTW)
+# -------------------------------
+# All times are integer minutes since midnight. Schools may override
+# the default hours with window_open / window_close columns.
+DEFAULT_TIME_WINDOWS = {
+    "school_hours": (9 * 60, 16 * 60),
+    "shift": (8 * 60, 18 * 60),
+    "speed_kmph": 30,
+    "setup_min": 15,  # fixed per school visit
+    "per_mbu_min": 1,  # per pending update
+}
+
+def time_window_model(df, distance_matrix, time_windows=None, num_depots=1, scale=1,
+                      travel_seconds=None):
+    # The first num_depots rows are depots: no demand, no service time.
+    # scale: metres per distance_matrix unit. travel_seconds (e.g. road
+    # travel times) replaces the distance / speed_kmph drive estimate.
+    config = {**DEFAULT_TIME_WINDOWS, **(time_windows or {})}
+    demands = df["pending_mbu"].to_numpy(dtype=float).copy()
+    demands[:num_depots] = 0
+
+    # Service at the origin node, so transit(i, j) = service(i) + drive(i, j)
+    service = np.ceil(config["setup_min"] + config["per_mbu_min"] * demands)
+    service[:num_depots] = 0
+    if travel_seconds is not None:
+        drive = np.ceil(np.asarray(travel_seconds) / 60)
+    else:
+        units_per_min = config["speed_kmph"] * 1000 / 60 / scale
+        drive = np.ceil(distance_matrix / units_per_min)
+    time_matrix = (drive + service[:, None]).astype(int)
+    np.fill_diagonal(time_matrix, 0)
+
+    open_min, close_min = config["school_hours"]
+    opens = np.full(len(df), open_min)
+    closes = np.full(len(df), close_min)
+    if "window_open" in df:
+        opens = df["window_open"].fillna(open_min).to_numpy(dtype=int)
+    if "window_close" in df:
+        closes = df["window_close"].fillna(close_min).to_numpy(dtype=int)
+
+    # Service has to finish by closing time, so the window must hold it
+    unfit = np.flatnonzero(closes - opens < service)
+    unfit = unfit[unfit >= num_depots]
+    if len(unfit):
+        names = df["school_name"].iloc[unfit[:5]].tolist() if "school_name" in df else unfit[:5].tolist()
+        raise ValueError(
+            f"{len(unfit)} school(s) need more service time than their window "
+            f"allows (e.g. {names}); widen the windows or split the visits"
+        )
+
+    return {
+        "time_matrix": time_matrix,
+        "time_windows": list(zip(opens.tolist(), closes.tolist())),
+        "service_times": service.astype(int),
+        "shift": config["shift"],
+    }
+
 # -------------------------------
 # Create OR-Tools data model
 # -------------------------------
-def create_data_model(df, num_vehicles, vehicle_capacity):
+def create_data_model(df, num_vehicles, vehicle_capacity, neighbors=None,
+                      road_graph=None, time_windows=None, matrix_store=None,
+                      num_depots=1):
     data = {}
 
     coords = df[['lat', 'lon']].to_numpy()
-    size = len(coords)
-
-    # Distance matrix (meters, int)
-    dist_matrix = np.zeros((size, size), dtype=int)
-    for i in range(size):
-        for j in range(size):
-            dist = haversine(
-                coords[i][1], coords[i][0],
-                coords[j][1], coords[j][0]
-            )
-            dist_matrix[i][j] = int(dist * 1000)
+    data["num_nodes"] = len(coords)
 
-    data["distance_matrix"] = dist_matrix
+    if road_graph is not None:
+        # Road distances (road_network.RoadGraph) instead of Haversine
+        data["distance_matrix"] = road_graph.distance_matrix(
+            coords[:, 0], coords[:, 1]
+        )
+    elif matrix_store is not None:
+        # Shared memory-mapped matrix (matrix_store.MatrixStore)
+        # Its stored units (scale metres each) are the model's distance
+        # unit, so the memmap is never expanded to a metres copy.
+        data["distance_matrix"] = matrix_store.get(coords[:, 0], coords[:, 1])
+        data["distance_scale"] = matrix_store.scale
+    elif neighbors:
+        # Sparse model: O(n * k) arcs plus depot row/column
+        data["distance_matrix"] = None
+        data["arc_costs"] = knn_arcs(coords[:, 0], coords[:, 1], neighbors)
+        data["depot_distances"] = depot_distances(coords[:, 0], coords[:, 1])
+    else:
+        # Distance matrix (meters, int)
+        data["distance_matrix"] = haversine_matrix(coords[:, 0], coords[:, 1])
 
     # Demands (Depot = 0)
     demands = df["pending_mbu"].tolist()
@@ -45,16 +194,225 @@ def create_data_model(df, num_vehicles, vehicle_capacity):
     data["num_vehicles"] = num_vehicles
     data["vehicle_capacities"] = [vehicle_capacity] * num_vehicles
     data["depot"] = 0
+    data["num_depots"] = num_depots  # depot rows come first in the frame
+
+    if time_windows is not None:
+        if data["distance_matrix"] is None:
+            raise ValueError("time windows need a dense distance matrix")
+        # Road graphs with travel times drive the clock directly
+        travel_seconds = None
+        if road_graph is not None and "travel_time_s" in road_graph.graphs:
+            travel_seconds = road_graph.distance_matrix(
+                coords[:, 0], coords[:, 1], weight="travel_time_s"
+            )
+        data.update(time_window_model(
+            df, data["distance_matrix"], time_windows, num_depots,
+            data.get("distance_scale", 1), travel_seconds
+        ))
 
     return data
 
 # -------------------------------
-# Solve Vehicle Routing Problem
+# Build OR-Tools routing model
 # -------------------------------
-def solve_vrp(df, num_vehicles=3, vehicle_capacity=200):
-    # Add depot row (first row)
+def build_routing_model(data):
+    if "starts" in data:
+        # Multi-depot: each van has its own start and end node
+        manager = pywrapcp.RoutingIndexManager(
+            data["num_nodes"],
+            data["num_vehicles"],
+            data["starts"],
+            data["ends"]
+        )
+    else:
+        manager = pywrapcp.RoutingIndexManager(
+            data["num_nodes"],
+            data["num_vehicles"],
+            data["depot"]
+        )
+
+    routing = pywrapcp.RoutingModel(manager)
+
+    # Distance: the dense matrix is registered natively so local search
+    # evaluates arcs in C++ without calling back into Python.
+    if data["distance_matrix"] is not None:
+        transit_cb = routing.RegisterTransitMatrix(
+            data["distance_matrix"].tolist()
+        )
+    else:
+        def sparse_distance_callback(from_index, to_index):
+            from_node = manager.IndexToNode(from_index)
+            to_node = manager.IndexToNode(to_index)
+            if from_node == to_node:
+                return 0
+            if from_node == data["depot"]:
+                return int(data["depot_distances"][to_node])
+            if to_node == data["depot"]:
+                return int(data["depot_distances"][from_node])
+            return data["arc_costs"].get(
+                from_node * data["num_nodes"] + to_node, SPARSE_BIG_M
+            )
+
+        transit_cb = routing.RegisterTransitCallback(sparse_distance_callback)
+
+    routing.SetArcCostEvaluatorOfAllVehicles(transit_cb)
+
+    # Capacity constraint
+    demand_cb = routing.RegisterUnaryTransitVector(
+        [int(d) for d in data["demands"]]
+    )
+
+    routing.AddDimensionWithVehicleCapacity(
+        demand_cb,
+        0,
+        data["vehicle_capacities"],
+        True,
+        "Capacity"
+    )
+
+    # Time dimension: precomputed travel + service matrix, also native
+    if "time_matrix" in data:
+        time_cb = routing.RegisterTransitMatrix(data["time_matrix"].tolist())
+        shift_start, shift_end = data["shift"]
+        routing.AddDimension(
+            time_cb,
+            shift_end - shift_start,  # waiting allowed at schools
+            shift_end,
+            False,
+            "Time"
+        )
+        time_dim = routing.GetDimensionOrDie("Time")
+
+        for node, (open_min, close_min) in enumerate(data["time_windows"]):
+            if node < data["num_depots"]:
+                continue
+            # Arrival bound: the visit's service must end by close_min
+            time_dim.CumulVar(manager.NodeToIndex(node)).SetRange(
+                open_min, close_min - int(data["service_times"][node])
+            )
+
+        for vehicle_id in range(data["num_vehicles"]):
+            time_dim.CumulVar(routing.Start(vehicle_id)).SetRange(
+                shift_start, shift_end
+            )
+            time_dim.CumulVar(routing.End(vehicle_id)).SetRange(
+                shift_start, shift_end
+            )
+            routing.AddVariableMinimizedByFinalizer(
+                time_dim.CumulVar(routing.Start(vehicle_id))
+            )
+            routing.AddVariableMinimizedByFinalizer(
+                time_dim.CumulVar(routing.End(vehicle_id))
+            )
+
+    return manager, routing
+
+# -------------------------------
+# Optional visits (disjunctions)
+# -------------------------------
+# Penalty (metres) per update left unserved on a day. Makes serving
+# backlog worth far more than the detour needed to reach it.
+UNSERVED_PENALTY_PER_MBU = 100_000
+
+def add_optional_visits(data, manager, routing):
+    # Lets the solver skip schools that do not fit the fleet, paying
+    # their demand in UNSERVED_PENALTY_PER_MBU instead. The (index,
+    # penalty) pairs let track_solutions report distance without them.
+    data["skip_penalties"] = []
+    for node in range(data.get("num_depots", 1), data["num_nodes"]):
+        index = manager.NodeToIndex(node)
+        penalty = int(data["demands"][node]) * UNSERVED_PENALTY_PER_MBU // data.get("distance_scale", 1)
+        routing.AddDisjunction([index], penalty)
+        data["skip_penalties"].append((index, penalty))
+
+# -------------------------------
+# Search parameters (anytime solving)
+# -------------------------------
+METAHEURISTICS = {
+    "guided_local_search":
+        routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH,
+    "simulated_annealing":
+        routing_enums_pb2.LocalSearchMetaheuristic.SIMULATED_ANNEALING,
+    "tabu_search":
+        routing_enums_pb2.LocalSearchMetaheuristic.TABU_SEARCH,
+}
+
+# Metaheuristics never stop on their own, and time-window models can
+# search for a long time before proving infeasibility; both are capped
+# when no budget is given.
+DEFAULT_TIME_LIMIT = 30  # seconds
+
+def build_search_params(time_limit=None, metaheuristic=None):
+    search_params = pywrapcp.DefaultRoutingSearchParameters()
+    search_params.first_solution_strategy = (
+        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    )
+
+    if metaheuristic is not None:
+        if metaheuristic not in METAHEURISTICS:
+            raise ValueError(
+                f"Unknown metaheuristic {metaheuristic!r}; "
+                f"expected one of {sorted(METAHEURISTICS)}"
+            )
+        search_params.local_search_metaheuristic = METAHEURISTICS[metaheuristic]
+        time_limit = time_limit or DEFAULT_TIME_LIMIT
+
+    if time_limit:
+        search_params.time_limit.FromMilliseconds(int(time_limit * 1000))
+
+    return search_params
+
+def track_solutions(routing, on_solution=None, trace=None, skip_penalties=None, scale=1):
+    # Reports every strictly improving solution as (elapsed_s, metres).
+    # Metaheuristics also accept worse moves, which are skipped. An
+    # on_solution that returns True stops the search (cancellation).
+    # skip_penalties (from add_optional_visits) are taken back out of
+    # the objective, so the reported cost is the distance driven;
+    # scale converts model distance units to metres.
+    start = time.perf_counter()
+    best = [None]
+
+    def solution_callback():
+        cost = routing.CostVar().Max()
+        if best[0] is not None and cost >= best[0]:
+            return
+        best[0] = cost
+        distance = scale * (cost - sum(
+            penalty for index, penalty in skip_penalties or ()
+            if not routing.ActiveVar(index).Value()
+        ))
+        elapsed = time.perf_counter() - start
+        if trace is not None:
+            trace.append((elapsed, distance))
+        if on_solution is not None and on_solution(distance, elapsed):
+            routing.solver().FinishCurrentSearch()
+
+    routing.AddAtSolutionCallback(solution_callback)
+
+# -------------------------------
+# Dashboard schema -> solver schema
+# -------------------------------
+DASHBOARD_COLUMNS = {
+    "latitude": "lat",
+    "longitude": "lon",
+    "backlog_students": "pending_mbu",
+}
+
+def to_vrp_frame(df):
+    # mock_school_data.csv layout: CRITICAL schools become High risk
+    vrp_df = df.rename(columns=DASHBOARD_COLUMNS)
+    vrp_df["risk_level"] = np.where(df["status"] == "CRITICAL", "High", "Low")
+    return vrp_df
+
+# -------------------------------
+# Depot + High-risk schools frame
+# -------------------------------
+def prepare_critical_df(df):
+    # Add depot row (first row); a depot row already there (e.g. an
+    # enrolment centre) keeps its name
+    first = df.iloc[0]
     depot = {
-        "school_name": "DEPOT",
+        "school_name": first["school_name"] if first.get("risk_level") == "Depot" else "DEPOT",
         "lat": df.iloc[0]["lat"],
         "lon": df.iloc[0]["lon"],
         "pending_mbu": 0,
@@ -65,77 +423,876 @@ def solve_vrp(df, num_vehicles=3, vehicle_capacity=200):
     critical_df = df[df["risk_level"] == "High"].copy()
 
     if critical_df.empty:
-        return []
+        return None
 
-    critical_df = pd.concat(
+    return pd.concat(
         [pd.DataFrame([depot]), critical_df],
         ignore_index=True
     )
 
-    data = create_data_model(critical_df, num_vehicles, vehicle_capacity)
+# -------------------------------
+# Per-phase solve profile
+# -------------------------------
+class SolveProfile:
+    # Wall/CPU seconds per solve_vrp phase (filter, matrix, model,
+    # search, extract), problem size, the (elapsed, metres) distance
+    # curve and peak RSS. Loggable as one JSON line per solve.
 
-    manager = pywrapcp.RoutingIndexManager(
-        len(data["distance_matrix"]),
-        data["num_vehicles"],
-        data["depot"]
-    )
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = {}
+        self.nodes = 0
+        self.vehicles = 0
+        self.curve = []
+        self.peak_rss_kb = None
 
-    routing = pywrapcp.RoutingModel(manager)
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
 
-    # Distance callback
-    def distance_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return data["distance_matrix"][from_node][to_node]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.phases[name] = {
+                "wall_s": round(time.perf_counter() - wall, 6),
+                "cpu_s": round(time.process_time() - cpu, 6),
+            }
+            if resource is not None:
+                self.peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
 
-    transit_cb = routing.RegisterTransitCallback(distance_callback)
-    routing.SetArcCostEvaluatorOfAllVehicles(transit_cb)
+    @property
+    def solutions(self):
+        return len(self.curve)
 
-    # Capacity constraint
-    def demand_callback(from_index):
-        from_node = manager.IndexToNode(from_index)
-        return data["demands"][from_node]
+    def to_dict(self):
+        return {
+            "phases": self.phases,
+            "nodes": self.nodes,
+            "vehicles": self.vehicles,
+            "solutions": self.solutions,
+            "distance_m": self.curve[-1][1] if self.curve else None,
+            "curve": [[round(t, 4), distance] for t, distance in self.curve],
+            "peak_rss_kb": self.peak_rss_kb,
+        }
 
-    demand_cb = routing.RegisterUnaryTransitCallback(demand_callback)
+    def log(self, path, **extra):
+        # Append as a JSON line (extra keys, e.g. a job id, go first)
+        with open(path, "a") as f:
+            f.write(json.dumps({**extra, **self.to_dict()}) + "\n")
 
-    routing.AddDimensionWithVehicleCapacity(
-        demand_cb,
-        0,
-        data["vehicle_capacities"],
-        True,
-        "Capacity"
-    )
+# -------------------------------
+# Solve Vehicle Routing Problem
+# -------------------------------
+def solve_vrp(df, num_vehicles=3, vehicle_capacity=200, neighbors=None,
+              time_limit=None, metaheuristic=None, on_solution=None,
+              trace=None, road_graph=None, time_windows=None,
+              matrix_store=None, profile=None, optional_visits=False):
+    # profile: a SolveProfile filled with per-phase timings, counts,
+    # the distance curve and peak RSS.
+    profile = profile if profile is not None else SolveProfile(enabled=False)
 
-    # Solver parameters
-    search_params = pywrapcp.DefaultRoutingSearchParameters()
-    search_params.first_solution_strategy = (
-        routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
-    )
+    with profile.phase("filter"):
+        critical_df = prepare_critical_df(df)
 
-    solution = routing.SolveWithParameters(search_params)
+    if critical_df is None:
+        return RouteSet.empty(df.iloc[:0])
+
+    # optional_visits plans a single day: each school gets at most one
+    # van-load and schools that do not fit the fleet are left out.
+    if optional_visits:
+        critical_df["pending_mbu"] = critical_df["pending_mbu"].clip(upper=vehicle_capacity)
+
+    # neighbors=k restricts arcs to each school's k nearest schools
+    # (plus the depot); memory grows linearly instead of n^2.
+    # road_graph swaps the straight-line matrix for road distances.
+    # time_windows (dict, {} for DEFAULT_TIME_WINDOWS) adds school
+    # hours, service times scaled by pending_mbu and van shifts.
+    # matrix_store reuses a memory-mapped matrix shared across processes.
+    with profile.phase("matrix"):
+        data = create_data_model(
+            critical_df, num_vehicles, vehicle_capacity, neighbors, road_graph,
+            time_windows, matrix_store
+        )
+    profile.nodes = data["num_nodes"]
+    profile.vehicles = data["num_vehicles"]
+
+    with profile.phase("model"):
+        manager, routing = build_routing_model(data)
+        if optional_visits:
+            add_optional_visits(data, manager, routing)
+
+    # Anytime mode: time_limit (s) bounds the search, metaheuristic
+    # keeps improving until then. on_solution(cost, elapsed) fires per
+    # improvement and trace collects the (elapsed, metres) curve.
+    if time_windows is not None:
+        time_limit = time_limit or DEFAULT_TIME_LIMIT
+    search_params = build_search_params(time_limit, metaheuristic)
+    if profile.enabled:
+        trace = profile.curve = trace if trace is not None else []
+    if on_solution is not None or trace is not None:
+        track_solutions(
+            routing, on_solution, trace, data.get("skip_penalties"),
+            data.get("distance_scale", 1)
+        )
+
+    with profile.phase("search"):
+        solution = routing.SolveWithParameters(search_params)
 
     if not solution:
-        return []
+        return RouteSet.empty(critical_df)
+
+    with profile.phase("extract"):
+        return extract_routes(data, manager, routing, solution, critical_df)
 
-    # -------------------------------
-    # Extract routes
-    # -------------------------------
+# -------------------------------
+# Extract routes
+# -------------------------------
+def route_nodes(data, manager, routing, solution):
+    # Node sequence per vehicle, depot start and end included
     routes = []
 
     for vehicle_id in range(data["num_vehicles"]):
         index = routing.Start(vehicle_id)
-        route = []
+        nodes = []
 
         while not routing.IsEnd(index):
-            node = manager.IndexToNode(index)
-            route.append(critical_df.iloc[node].to_dict())
+            nodes.append(manager.IndexToNode(index))
             index = solution.Value(routing.NextVar(index))
 
         # End at depot
-        node = manager.IndexToNode(index)
-        route.append(critical_df.iloc[node].to_dict())
-
-        if len(route) > 1:
-            routes.append(route)
+        nodes.append(manager.IndexToNode(index))
+        routes.append(nodes)
 
     return routes
+
+def route_arrivals(data, routing, solution):
+    # Earliest feasible arrival (Time cumul) at every stop, in route order
+    time_dim = routing.GetDimensionOrDie("Time")
+    arrivals = []
+
+    for vehicle_id in range(data["num_vehicles"]):
+        index = routing.Start(vehicle_id)
+        while True:
+            arrivals.append(solution.Min(time_dim.CumulVar(index)))
+            if routing.IsEnd(index):
+                break
+            index = solution.Value(routing.NextVar(index))
+
+    return arrivals
+
+def extract_routes(data, manager, routing, solution, critical_df):
+    arrivals = None
+    if "time_matrix" in data:
+        arrivals = route_arrivals(data, routing, solution)
+
+    return RouteSet.from_nodes(
+        critical_df, route_nodes(data, manager, routing, solution),
+        distance_matrix=data["distance_matrix"], arrivals=arrivals,
+        distance_scale=data.get("distance_scale", 1)
+    )
+
+# -------------------------------
+# Columnar route plan
+# -------------------------------
+class RouteSet:
+    # Solved plan as flat int arrays over the depot + schools frame:
+    # nodes[offsets[r]:offsets[r + 1]] is route r (depot at both ends)
+    # driven by vehicle_ids[r]. School data is never copied per stop;
+    # indexing a route still yields the legacy list of stop dicts.
+
+    def __init__(self, frame, nodes, offsets, vehicle_ids, demand_col="pending_mbu",
+                 distance_matrix=None, arrivals=None, distance_scale=1):
+        self.frame = frame
+        self.nodes = np.asarray(nodes, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.vehicle_ids = np.asarray(vehicle_ids, dtype=np.int32)
+        # Arrival minute per stop when solved with time windows
+        self.arrivals = None if arrivals is None else np.asarray(arrivals, dtype=np.int32)
+
+        counts = np.diff(self.offsets)
+        self.stop_vehicle = np.repeat(self.vehicle_ids, counts)
+        self.stop_order = (
+            np.arange(len(self.nodes)) - np.repeat(self.offsets[:-1], counts)
+        ).astype(np.int32)
+
+        # Per-route totals from leg distances and stop demands; legs
+        # come from the model's matrix when given (distance_scale metres
+        # per unit), else Haversine.
+        legs = np.zeros(len(self.nodes), dtype=np.int64)
+        if len(self.nodes) > 1 and distance_matrix is not None:
+            legs[1:] = distance_matrix[self.nodes[:-1], self.nodes[1:]]
+            legs *= distance_scale
+        elif len(self.nodes) > 1:
+            lat = np.radians(frame["lat"].to_numpy(dtype=float))[self.nodes]
+            lon = np.radians(frame["lon"].to_numpy(dtype=float))[self.nodes]
+            legs[1:] = _haversine_m(lat[:-1], lon[:-1], lat[1:], lon[1:])
+        legs[self.stop_order == 0] = 0
+        demand = frame[demand_col].to_numpy()[self.nodes].astype(np.int64)
+        demand[self.stop_order == 0] = 0
+
+        starts = self.offsets[:-1]
+        if len(starts):
+            self.distances = np.add.reduceat(legs, starts)
+            self.loads = np.add.reduceat(demand, starts)
+        else:
+            self.distances = np.zeros(0, dtype=np.int64)
+            self.loads = np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_nodes(cls, frame, routes, vehicle_ids=None, **kwargs):
+        counts = [len(route) for route in routes]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        nodes = np.concatenate(routes) if routes else np.zeros(0)
+        if vehicle_ids is None:
+            vehicle_ids = np.arange(len(routes))
+        return cls(frame, nodes, offsets, vehicle_ids, **kwargs)
+
+    @classmethod
+    def empty(cls, frame):
+        # No routes over frame: nothing to visit, or no feasible plan
+        return cls(frame, [], [0], [])
+
+    @classmethod
+    def concat(cls, route_sets, **kwargs):
+        # Stitches independently solved plans; node and vehicle ids are
+        # shifted so every plan keeps its own depot rows and vans.
+        route_sets = list(route_sets)
+        frames, nodes, offsets, vehicles = [], [], [np.zeros(1, dtype=np.int64)], []
+        node_base = stop_base = vehicle_base = 0
+
+        for rs in route_sets:
+            frames.append(rs.frame)
+            nodes.append(rs.nodes + node_base)
+            offsets.append(rs.offsets[1:] + stop_base)
+            vehicles.append(rs.vehicle_ids + vehicle_base)
+            node_base += len(rs.frame)
+            stop_base += len(rs.nodes)
+            vehicle_base += int(rs.vehicle_ids.max()) + 1 if len(rs) else 0
+
+        if not frames:
+            return cls.empty(pd.DataFrame(columns=["school_name", "lat", "lon", "pending_mbu", "risk_level"]))
+
+        arrivals = None
+        if all(rs.arrivals is not None for rs in route_sets):
+            arrivals = np.concatenate([rs.arrivals for rs in route_sets])
+
+        combined = cls(
+            pd.concat(frames, ignore_index=True),
+            np.concatenate(nodes),
+            np.concatenate(offsets),
+            np.concatenate(vehicles),
+            arrivals=arrivals,
+            **kwargs
+        )
+        # Keep each plan's own leg distances (e.g. road matrices)
+        combined.distances = np.concatenate([rs.distances for rs in route_sets])
+        return combined
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        for r in range(len(self)):
+            yield self[r]
+
+    def __getitem__(self, r):
+        if isinstance(r, slice):
+            return [self[i] for i in range(len(self))[r]]
+        return self.stops(r).to_dict("records")
+
+    def route_view(self, r):
+        # Node indices of route r; a view, not a copy
+        r = range(len(self))[r]
+        return self.nodes[self.offsets[r]:self.offsets[r + 1]]
+
+    def stops(self, r):
+        return self.frame.iloc[self.route_view(r)]
+
+    def to_manifest(self):
+        manifest = self.frame.iloc[self.nodes].reset_index(drop=True)
+        manifest.insert(0, "vehicle_id", self.stop_vehicle)
+        manifest.insert(1, "stop_order", self.stop_order)
+        manifest.insert(2, "node", self.nodes)
+        if self.arrivals is not None:
+            manifest.insert(3, "arrival_min", self.arrivals)
+        return manifest
+
+    @property
+    def trips(self):
+        # 1-based trip of each route for its van; above 1 only when a
+        # plan reuses vans (solve_vrp_savings with a small fleet)
+        order = np.argsort(self.vehicle_ids, kind="stable")
+        ids = self.vehicle_ids[order]
+        trips = np.empty(len(ids), dtype=np.int32)
+        trips[order] = np.arange(len(ids)) - np.searchsorted(ids, ids) + 1
+        return trips
+
+    def to_lines(self):
+        # One row per route with a [[lon, lat], ...] path (pydeck
+        # PathLayer / plotly line-ready) and its totals.
+        coords = self.frame[["lon", "lat"]].to_numpy(dtype=float)[self.nodes]
+        paths = np.split(coords, self.offsets[1:-1]) if len(self) else []
+        return pd.DataFrame({
+            "vehicle_id": self.vehicle_ids,
+            "trip": self.trips,
+            "path": [path.tolist() for path in paths],
+            "distance_m": self.distances,
+            "load": self.loads,
+        })
+
+# -------------------------------
+# Cluster-first, route-second decomposition
+# -------------------------------
+CLUSTER_SLACK = 1.1  # a cluster may take this much over its even share
+def capacity_kmeans(lat, lon, demand, k, slack=CLUSTER_SLACK, iters=20, seed=0, caps=None):
+    # k-means over an equirectangular projection, with assignment
+    # capped so no cluster holds more than its share of total demand,
+    # or more than caps[c] when given (e.g. what its vans can carry).
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    demand = np.asarray(demand, dtype=float)
+    xy = np.column_stack([lon * np.cos(lat.mean()), lat])
+    size = len(xy)
+    k = min(k, size)
+
+    if caps is None:
+        cap = np.full(k, demand.sum() / k * slack)
+    else:
+        cap = np.asarray(caps, dtype=float)[:k]
+    rng = np.random.default_rng(seed)
+    centroids = xy[rng.choice(size, k, replace=False)]
+    labels = np.zeros(size, dtype=int)
+
+    for _ in range(iters):
+        d = ((xy[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+        choices = np.argsort(d, axis=1)
+        # Most constrained points first: largest gap to 2nd choice
+        if k > 1:
+            regret = np.take_along_axis(d, choices[:, 1:2], axis=1)[:, 0] - d.min(axis=1)
+        else:
+            regret = np.zeros(size)
+
+        load = np.zeros(k)
+        new_labels = np.empty(size, dtype=int)
+        for i in np.argsort(-regret):
+            for c in choices[i]:
+                if load[c] + demand[i] <= cap[c]:
+                    break
+            else:
+                c = int(np.argmax(cap - load))  # over every cap: most room left
+            new_labels[i] = c
+            load[c] += demand[i]
+
+        for c in range(k):
+            members = new_labels == c
+            if members.any():
+                centroids[c] = xy[members].mean(axis=0)
+
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    return labels
+
+def split_vehicles(demands, num_vehicles):
+    # Largest-remainder share of vans by partition demand, at least one each
+    demands = np.asarray(demands, dtype=float)
+    if len(demands) > num_vehicles:
+        raise ValueError(
+            f"{len(demands)} partitions need at least as many vehicles, "
+            f"got {num_vehicles}"
+        )
+
+    share = demands / demands.sum() * num_vehicles
+    vans = np.maximum(np.floor(share).astype(int), 1)
+    for i in np.argsort(-(share - np.floor(share))):
+        if vans.sum() >= num_vehicles:
+            break
+        vans[i] += 1
+    while vans.sum() > num_vehicles:
+        vans[np.argmax(vans)] -= 1
+
+    return vans.tolist()
+
+def _solve_partition(args):
+    part_df, num_vehicles, vehicle_capacity, solve_kwargs = args
+    return solve_vrp(part_df, num_vehicles, vehicle_capacity, **solve_kwargs)
+
+def solve_vrp_partitioned(df, num_vehicles=3, vehicle_capacity=200,
+                          partition_by="kmeans", num_partitions=None,
+                          max_workers=None, **solve_kwargs):
+    # partition_by: "district" (needs a district column) or "kmeans".
+    # Each partition gets a depot at the school nearest its centroid and
+    # a demand-proportional share of the vans; partitions are solved in
+    # a process pool and stitched back into one RouteSet.
+    critical_df = df[df["risk_level"] == "High"]
+
+    if critical_df.empty:
+        return RouteSet.empty(critical_df)
+
+    if partition_by == "district":
+        labels = pd.factorize(critical_df["district"])[0]
+    elif partition_by == "kmeans":
+        k = min(num_partitions or min(num_vehicles, os.cpu_count() or 1), len(critical_df))
+        # Vans are shared out first, so each cluster is capped at what
+        # its own vans can carry (and at its share of demand plus slack)
+        planned = np.asarray(split_vehicles(np.ones(k), num_vehicles))
+        per_van = min(critical_df["pending_mbu"].sum() / num_vehicles * CLUSTER_SLACK, vehicle_capacity)
+        labels = capacity_kmeans(
+            critical_df["lat"], critical_df["lon"],
+            critical_df["pending_mbu"], k, caps=planned * per_van
+        )
+    else:
+        raise ValueError(
+            f"Unknown partition_by {partition_by!r}; "
+            "expected 'district' or 'kmeans'"
+        )
+
+    clusters = np.unique(labels)
+    parts = [critical_df[labels == c] for c in clusters]
+    demands = [p["pending_mbu"].sum() for p in parts]
+    if partition_by == "kmeans":
+        # Vans of clusters left empty go to the busiest one
+        vans = planned[clusters]
+        vans[np.argmax(demands)] += num_vehicles - vans.sum()
+        vans = vans.tolist()
+    else:
+        vans = split_vehicles(demands, num_vehicles)
+
+    jobs = []
+    for part, part_vans in zip(parts, vans):
+        lat, lon = part["lat"].to_numpy(), part["lon"].to_numpy()
+        hub = int(np.argmin((lat - lat.mean()) ** 2 + (lon - lon.mean()) ** 2))
+        depot = {
+            "school_name": "DEPOT",
+            "lat": lat[hub],
+            "lon": lon[hub],
+            "pending_mbu": 0,
+            "risk_level": "Depot"
+        }
+        part_df = pd.concat([pd.DataFrame([depot]), part], ignore_index=True)
+        jobs.append((part_df, part_vans, vehicle_capacity, solve_kwargs))
+
+    return _solve_partitions(jobs, max_workers)
+
+def _solve_partitions(jobs, max_workers=None):
+    if len(jobs) == 1 or max_workers == 1:
+        results = map(_solve_partition, jobs)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_solve_partition, jobs))
+
+    # An infeasible partition must not silently drop its schools
+    results = list(results)
+    failed = [
+        f"{len(part_df) - 1} schools / {int(part_df['pending_mbu'].sum())} updates on {vans} van(s)"
+        for (part_df, vans, _, _), rs in zip(jobs, results) if not len(rs)
+    ]
+    if failed:
+        raise ValueError(
+            f"No feasible plan for {len(failed)} of {len(jobs)} partitions "
+            f"({'; '.join(failed)}) at vehicle_capacity {jobs[0][2]}; "
+            "add vehicles or raise the capacity"
+        )
+
+    return RouteSet.concat(results)
+
+# -------------------------------
+# Incremental re-optimization (warm start)
+# -------------------------------
+def _stop_key(stop):
+    # Schools are matched across days by id, else by coordinates
+    if "school_id" in stop:
+        return stop["school_id"]
+    return (stop["lat"], stop["lon"])
+
+def repair_routes(previous_routes, critical_df, num_vehicles, vehicle_capacity):
+    # Maps yesterday's routes onto today's node indices: drops schools
+    # that left the High-risk set, trims overloaded routes and inserts
+    # new or displaced schools at their cheapest feasible position.
+    # Returns per-vehicle node lists (depot excluded) and the nodes that
+    # could not be placed.
+    stops = critical_df.to_dict("records")
+    node_of = {_stop_key(stop): node for node, stop in enumerate(stops) if node}
+    demands = critical_df["pending_mbu"].to_numpy(dtype=int).copy()
+    demands[0] = 0
+
+    routes = []
+    seen = set()
+    for route in previous_routes[:num_vehicles]:
+        nodes = []
+        for stop in route[1:-1]:
+            node = node_of.get(_stop_key(stop))
+            if node is not None and node not in seen:
+                nodes.append(node)
+                seen.add(node)
+        routes.append(nodes)
+    routes += [[] for _ in range(num_vehicles - len(routes))]
+
+    pending = [node for node in range(1, len(stops)) if node not in seen]
+    for nodes in routes:
+        while nodes and demands[nodes].sum() > vehicle_capacity:
+            pending.append(nodes.pop())
+
+    lat = np.radians(critical_df["lat"].to_numpy(dtype=float))
+    lon = np.radians(critical_df["lon"].to_numpy(dtype=float))
+    load = [int(demands[nodes].sum()) for nodes in routes]
+    unplaced = []
+
+    # Largest demands first; they have the fewest feasible routes
+    for node in sorted(pending, key=lambda n: -demands[n]):
+        best = None
+        for vehicle, nodes in enumerate(routes):
+            if load[vehicle] + demands[node] > vehicle_capacity:
+                continue
+            path = np.array([0] + nodes + [0])
+            a, b = path[:-1], path[1:]
+            delta = (
+                _haversine_m(lat[a], lon[a], lat[node], lon[node])
+                + _haversine_m(lat[node], lon[node], lat[b], lon[b])
+                - _haversine_m(lat[a], lon[a], lat[b], lon[b])
+            )
+            pos = int(np.argmin(delta))
+            if best is None or delta[pos] < best[0]:
+                best = (delta[pos], vehicle, pos)
+
+        if best is None:
+            unplaced.append(node)
+            continue
+
+        _, vehicle, pos = best
+        routes[vehicle].insert(pos, node)
+        load[vehicle] += int(demands[node])
+
+    return routes, unplaced
+
+def reoptimize_vrp(df, previous_routes, num_vehicles=3, vehicle_capacity=200,
+                   neighbors=None, time_limit=None, metaheuristic=None,
+                   on_solution=None, trace=None):
+    # Daily replan: seeds OR-Tools with yesterday's routes repaired for
+    # today's High-risk set and backlogs. Local search starts from that
+    # assignment, so it converges quickly and routes stay familiar to
+    # drivers. Falls back to a cold solve if the repair is infeasible.
+    critical_df = prepare_critical_df(df)
+
+    if critical_df is None:
+        return RouteSet.empty(df.iloc[:0])
+
+    data = create_data_model(
+        critical_df, num_vehicles, vehicle_capacity, neighbors
+    )
+
+    manager, routing = build_routing_model(data)
+
+    search_params = build_search_params(time_limit, metaheuristic)
+    if on_solution is not None or trace is not None:
+        track_solutions(routing, on_solution, trace)
+
+    seed_routes, unplaced = repair_routes(
+        previous_routes, critical_df, num_vehicles, vehicle_capacity
+    )
+
+    routing.CloseModelWithParameters(search_params)
+    initial = None
+    if not unplaced:
+        initial = routing.ReadAssignmentFromRoutes(seed_routes, True)
+
+    if initial is not None:
+        solution = routing.SolveFromAssignmentWithParameters(
+            initial, search_params
+        )
+    else:
+        solution = routing.SolveWithParameters(search_params)
+
+    if not solution:
+        return RouteSet.empty(critical_df)
+
+    return extract_routes(data, manager, routing, solution, critical_df)
+
+# -------------------------------
+# Multi-day rolling-horizon campaign
+# -------------------------------
+
+def plan_campaign(df, num_vehicles=3, vehicle_capacity=200, max_days=60,
+                  time_limit=2, metaheuristic=None):
+    # Plans one trip per van per day until the High-risk backlog is
+    # cleared or max_days is reached. Schools are optional visits
+    # (disjunctions) serving at most one van-load per day; unserved
+    # demand carries over. The distance matrix is built once and
+    # sliced per day, and each day is seeded with the previous day's
+    # routes. Returns one RouteSet per day; every stop carries the
+    # served_mbu delivered that day.
+    critical_df = prepare_critical_df(df)
+
+    if critical_df is None:
+        return []
+
+    coords = critical_df[["lat", "lon"]].to_numpy()
+    full_matrix = haversine_matrix(coords[:, 0], coords[:, 1])
+
+    remaining = critical_df["pending_mbu"].to_numpy(dtype=int).copy()
+    remaining[0] = 0
+
+    schedule = []
+    previous = []
+
+    for _ in range(max_days):
+        active = np.flatnonzero(remaining > 0)
+        if not len(active):
+            break
+
+        nodes = np.concatenate([[0], active])
+        day_demand = np.minimum(remaining[nodes], vehicle_capacity)
+        day_demand[0] = 0
+
+        data = {
+            "num_nodes": len(nodes),
+            "distance_matrix": full_matrix[np.ix_(nodes, nodes)],
+            "demands": day_demand.tolist(),
+            "num_vehicles": num_vehicles,
+            "vehicle_capacities": [vehicle_capacity] * num_vehicles,
+            "depot": 0,
+        }
+
+        manager, routing = build_routing_model(data)
+        add_optional_visits(data, manager, routing)
+
+        search_params = build_search_params(time_limit, metaheuristic)
+        routing.CloseModelWithParameters(search_params)
+
+        # Yesterday's routes, restricted to schools still pending
+        local_of = {int(g): i for i, g in enumerate(nodes) if i}
+        seed_routes = []
+        for route in previous[:num_vehicles]:
+            seed = [local_of[g] for g in route if g in local_of]
+            while seed and day_demand[seed].sum() > vehicle_capacity:
+                seed.pop()
+            seed_routes.append(seed)
+        seed_routes += [[] for _ in range(num_vehicles - len(seed_routes))]
+
+        initial = routing.ReadAssignmentFromRoutes(seed_routes, True)
+        if initial is not None:
+            solution = routing.SolveFromAssignmentWithParameters(
+                initial, search_params
+            )
+        else:
+            solution = routing.SolveWithParameters(search_params)
+
+        if not solution:
+            break
+
+        day_routes = route_nodes(data, manager, routing, solution)
+        visited = [node for route in day_routes for node in route[1:-1]]
+        if not visited:
+            break
+
+        day_df = critical_df.iloc[nodes].reset_index(drop=True)
+        day_df["served_mbu"] = day_demand
+        schedule.append(
+            RouteSet.from_nodes(day_df, day_routes, demand_col="served_mbu")
+        )
+
+        remaining[nodes[visited]] -= day_demand[visited]
+        previous = [[int(nodes[n]) for n in route[1:-1]] for route in day_routes]
+
+    return schedule
+
+# -------------------------------
+# Multi-depot routing
+# -------------------------------
+def nearest_depots(lat, lon, depot_lat, depot_lon, k=1):
+    # (n, k) indices of each school's k nearest depots, nearest first
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    depot_lat = np.radians(np.asarray(depot_lat, dtype=float))
+    depot_lon = np.radians(np.asarray(depot_lon, dtype=float))
+    cos_lat = np.cos(depot_lat.mean())
+
+    tree = cKDTree(np.column_stack([depot_lon * cos_lat, depot_lat]))
+    _, idx = tree.query(np.column_stack([lon * cos_lat, lat]), k=k)
+    return np.asarray(idx).reshape(len(lat), k)
+
+def _depot_rows(depots):
+    names = depots["name"] if "name" in depots else [
+        f"DEPOT-{i + 1}" for i in range(len(depots))
+    ]
+    return pd.DataFrame({
+        "school_name": list(names),
+        "lat": depots["lat"].to_numpy(),
+        "lon": depots["lon"].to_numpy(),
+        "pending_mbu": 0,
+        "risk_level": "Depot",
+    })
+
+def solve_vrp_multi_depot(df, depots, vans_per_depot=1, vehicle_capacity=200,
+                          candidate_depots=2, time_limit=None,
+                          metaheuristic=None, on_solution=None, trace=None,
+                          road_graph=None, time_windows=None,
+                          max_workers=None):
+    # depots: frame of enrolment centres (lat, lon[, name]). Every van
+    # starts and ends at its own centre; vans_per_depot is an int or
+    # one count per centre. A KD-tree over the centres limits each
+    # school to the vans of its candidate_depots nearest centres.
+    # candidate_depots=1 splits the instance exactly by nearest centre
+    # into independent per-centre models solved in a process pool; the
+    # on_solution/trace callbacks cannot follow them there.
+    depots = depots.reset_index(drop=True)
+    vans = np.broadcast_to(np.asarray(vans_per_depot, dtype=int), len(depots))
+    depots, vans = depots[vans > 0].reset_index(drop=True), vans[vans > 0]
+
+    critical_df = df[df["risk_level"] == "High"]
+
+    if candidate_depots == 1 and (on_solution is not None or trace is not None):
+        raise ValueError(
+            "on_solution/trace are not supported with candidate_depots=1; "
+            "per-centre models are solved in separate processes"
+        )
+
+    if critical_df.empty or depots.empty:
+        return RouteSet.empty(critical_df.iloc[:0])
+
+    k = min(candidate_depots, len(depots))
+    near = nearest_depots(
+        critical_df["lat"], critical_df["lon"], depots["lat"], depots["lon"], k
+    )
+    depot_rows = _depot_rows(depots)
+
+    if candidate_depots == 1:
+        solve_kwargs = {
+            "time_limit": time_limit, "metaheuristic": metaheuristic,
+            "road_graph": road_graph, "time_windows": time_windows,
+        }
+        jobs = []
+        for d in range(len(depots)):
+            part = critical_df[near[:, 0] == d]
+            if part.empty:
+                continue
+            part_df = pd.concat([depot_rows.iloc[[d]], part], ignore_index=True)
+            jobs.append((part_df, int(vans[d]), vehicle_capacity, solve_kwargs))
+        return _solve_partitions(jobs, max_workers)
+
+    frame = pd.concat([depot_rows, critical_df], ignore_index=True)
+    data = create_data_model(
+        frame, int(vans.sum()), vehicle_capacity,
+        road_graph=road_graph, time_windows=time_windows,
+        num_depots=len(depots)
+    )
+    data["starts"] = np.repeat(np.arange(len(depots)), vans).tolist()
+    data["ends"] = data["starts"]
+
+    manager, routing = build_routing_model(data)
+
+    # Candidate vans per school: those based at its nearest centres
+    first_van = np.concatenate([[0], np.cumsum(vans)])
+    for i, candidates in enumerate(near):
+        allowed = [
+            v for d in candidates
+            for v in range(int(first_van[d]), int(first_van[d + 1]))
+        ]
+        routing.VehicleVar(manager.NodeToIndex(len(depots) + i)).SetValues(
+            allowed
+        )
+
+    if time_windows is not None:
+        time_limit = time_limit or DEFAULT_TIME_LIMIT
+    search_params = build_search_params(time_limit, metaheuristic)
+    if on_solution is not None or trace is not None:
+        track_solutions(routing, on_solution, trace)
+
+    solution = routing.SolveWithParameters(search_params)
+
+    if not solution:
+        return RouteSet.empty(frame)
+
+    return extract_routes(data, manager, routing, solution, frame)
+
+# -------------------------------
+# Savings preview (Clarke-Wright)
+# -------------------------------
+# Candidate merges per school; the best savings are almost always
+# between near neighbours, and this keeps the merge loop O(n * k).
+SAVINGS_NEIGHBORS = 25
+
+def solve_vrp_savings(df, num_vehicles=3, vehicle_capacity=200,
+                      neighbors=SAVINGS_NEIGHBORS):
+    # Instant capacity-feasible plan for live previews while the
+    # OR-Tools solve runs. Same RouteSet format as solve_vrp; when more
+    # routes than vans are needed, vans run extra trips (vehicle ids
+    # wrap around, RouteSet.trips numbers them). A school with more
+    # pending updates than one van carries is split into full van-loads
+    # plus the remainder, one frame row per visit, so no route exceeds
+    # vehicle_capacity.
+    if vehicle_capacity < 1:
+        raise ValueError(f"vehicle_capacity must be at least 1, got {vehicle_capacity}")
+
+    critical_df = prepare_critical_df(df)
+
+    if critical_df is None:
+        return RouteSet.empty(df.iloc[:0])
+
+    demand = critical_df["pending_mbu"].to_numpy(dtype=np.int64)
+    visits = np.maximum(-(-demand // vehicle_capacity), 1)
+    if (visits > 1).any():
+        critical_df = critical_df.loc[critical_df.index.repeat(visits)].reset_index(drop=True)
+        part = np.arange(len(critical_df)) - np.repeat(np.cumsum(visits) - visits, visits)
+        left = np.repeat(demand, visits) - part * vehicle_capacity
+        critical_df["pending_mbu"] = np.minimum(left, vehicle_capacity)
+
+    coords = critical_df[["lat", "lon"]].to_numpy()
+    dist = haversine_matrix(coords[:, 0], coords[:, 1])
+    demands = critical_df["pending_mbu"].to_numpy(dtype=np.int64).copy()
+    demands[0] = 0
+    size = len(coords)
+
+    # Savings of joining i and j instead of serving both from the depot
+    if neighbors and neighbors < size - 2:
+        schools = dist[1:, 1:]
+        near = np.argpartition(schools, neighbors, axis=1)[:, :neighbors + 1] + 1
+        i = np.repeat(np.arange(1, size), neighbors + 1)
+        j = near.ravel()
+        pairs = np.unique(np.minimum(i, j) * size + np.maximum(i, j))
+        i, j = pairs // size, pairs % size
+        keep = i != j
+    else:
+        i, j = np.triu_indices(size, k=1)
+        keep = i > 0
+    i, j = i[keep], j[keep]
+    savings = dist[0, i] + dist[0, j] - dist[i, j]
+    order = np.argsort(-savings, kind="stable")
+    order = order[savings[order] > 0]
+
+    routes = {node: [node] for node in range(1, size)}
+    route_of = np.arange(size)
+    load = demands.copy()
+
+    for a, b in zip(i[order].tolist(), j[order].tolist()):
+        ra, rb = route_of[a], route_of[b]
+        if ra == rb or load[ra] + load[rb] > vehicle_capacity:
+            continue
+
+        route_a, route_b = routes[ra], routes[rb]
+        # Both must be route endpoints; orient so a ends A and b starts B
+        if route_a[-1] != a:
+            if route_a[0] != a:
+                continue
+            route_a.reverse()
+        if route_b[0] != b:
+            if route_b[-1] != b:
+                continue
+            route_b.reverse()
+
+        route_a.extend(route_b)
+        route_of[route_b] = ra
+        load[ra] += load[rb]
+        del routes[rb]
+
+    plan = [[0] + route + [0] for route in routes.values()]
+    plan += [[0, 0] for _ in range(num_vehicles - len(plan))]
+    vehicle_ids = np.arange(len(plan)) % max(num_vehicles, 1)
+
+    return RouteSet.from_nodes(
+        critical_df, plan, vehicle_ids, distance_matrix=dist
+    )
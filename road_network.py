@@ -0,0 +1,158 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+from optimizer import SPARSE_BIG_M, _haversine_m
+
+# -------------------------------
+# Offline road-network distances
+# -------------------------------
+# Graph files are plain edge lists, e.g. an OSM extract exported as
+#   nodes: node_id, lat, lon
+#   edges: u, v, length_m[, travel_time_s][, oneway]
+ROAD_CACHE_DIR = ".road_cache"
+
+# Sources per Dijkstra batch; bounds the batch x graph-size float64
+# result that scipy returns before the target columns are taken.
+DIJKSTRA_BATCH = 64
+
+# Off-network leg (school to its snapped road node) for time weights
+OFFROAD_SPEED_KMPH = 20
+
+FINGERPRINT_CHUNK = 1 << 20  # bytes read per hash update
+
+def _read_table(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+def _file_fingerprint(*paths):
+    # Hash of the files' contents: an edited graph gets new cached
+    # matrices, a copied or touched one keeps them
+    digest = hashlib.sha256()
+    for path in paths:
+        file_digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(FINGERPRINT_CHUNK), b""):
+                file_digest.update(chunk)
+        digest.update(file_digest.digest())
+    return digest.hexdigest()
+
+class RoadGraph:
+    # Directed road graph with one CSR adjacency per edge weight and a
+    # KD-tree over node coordinates for snapping schools and depots.
+
+    def __init__(self, node_lat, node_lon, u, v, weights, oneway=None,
+                 fingerprint=None):
+        self.node_lat = np.asarray(node_lat, dtype=float)
+        self.node_lon = np.asarray(node_lon, dtype=float)
+        self.fingerprint = fingerprint
+        size = len(self.node_lat)
+
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        if oneway is None:
+            oneway = np.zeros(len(u), dtype=bool)
+        two_way = ~np.asarray(oneway, dtype=bool)
+
+        src = np.concatenate([u, v[two_way]])
+        dst = np.concatenate([v, u[two_way]])
+
+        # One CSR graph per weight; parallel edges keep the cheapest
+        self.graphs = {}
+        for name, w in weights.items():
+            w = np.asarray(w, dtype=float)
+            w = np.concatenate([w, w[two_way]])
+            order = np.lexsort((w, dst, src))
+            keep = np.ones(len(order), dtype=bool)
+            keep[1:] = (np.diff(src[order]) != 0) | (np.diff(dst[order]) != 0)
+            order = order[keep]
+            self.graphs[name] = csr_matrix(
+                (w[order], (src[order], dst[order])), shape=(size, size)
+            )
+
+        # Equirectangular KD-tree for snapping
+        self._cos_lat = np.cos(np.radians(self.node_lat.mean()))
+        self._tree = cKDTree(self._project(self.node_lat, self.node_lon))
+
+    @classmethod
+    def load(cls, nodes_path, edges_path):
+        nodes = _read_table(nodes_path)
+        edges = _read_table(edges_path)
+
+        ids = pd.Index(nodes["node_id"])
+        u = ids.get_indexer(edges["u"])
+        v = ids.get_indexer(edges["v"])
+        known = (u >= 0) & (v >= 0)
+
+        weights = {"length_m": edges["length_m"].to_numpy()[known]}
+        if "travel_time_s" in edges:
+            weights["travel_time_s"] = edges["travel_time_s"].to_numpy()[known]
+        oneway = edges["oneway"].to_numpy(dtype=bool)[known] if "oneway" in edges else None
+
+        return cls(
+            nodes["lat"], nodes["lon"], u[known], v[known], weights, oneway,
+            fingerprint=_file_fingerprint(nodes_path, edges_path),
+        )
+
+    def _project(self, lat, lon):
+        return np.column_stack([np.asarray(lon) * self._cos_lat, np.asarray(lat)])
+
+    def snap(self, lat, lon):
+        # Nearest road node per point and the straight-line metres to it
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        _, node = self._tree.query(self._project(lat, lon))
+        offset = _haversine_m(
+            np.radians(lat), np.radians(lon),
+            np.radians(self.node_lat[node]), np.radians(self.node_lon[node])
+        )
+        return node, offset
+
+    def node_matrix(self, nodes, weight="length_m", cache_dir=ROAD_CACHE_DIR):
+        # Shortest-path matrix between road nodes, batched multi-source
+        # Dijkstra; cached on disk per graph file, weight and node set.
+        nodes = np.asarray(nodes, dtype=np.int64)
+        path = None
+        if cache_dir and self.fingerprint:
+            key = hashlib.sha256(
+                f"{self.fingerprint}:{weight}:".encode() + nodes.tobytes()
+            ).hexdigest()
+            path = os.path.join(cache_dir, f"{key}.npy")
+            if os.path.exists(path):
+                return np.load(path)
+
+        graph = self.graphs[weight]
+        matrix = np.empty((len(nodes), len(nodes)), dtype=float)
+        for start in range(0, len(nodes), DIJKSTRA_BATCH):
+            batch = nodes[start:start + DIJKSTRA_BATCH]
+            dist = dijkstra(graph, directed=True, indices=batch)
+            matrix[start:start + len(batch)] = dist[:, nodes]
+
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.save(path, matrix)
+
+        return matrix
+
+    def distance_matrix(self, lat, lon, weight="length_m", cache_dir=ROAD_CACHE_DIR):
+        # Drop-in for haversine_matrix: integer metres (or seconds for a
+        # time weight) between points, including the off-road legs to
+        # and from the snapped nodes. Unreachable pairs cost SPARSE_BIG_M.
+        node, offset = self.snap(lat, lon)
+        unique, inverse = np.unique(node, return_inverse=True)
+        road = self.node_matrix(unique, weight, cache_dir)[np.ix_(inverse, inverse)]
+
+        if weight != "length_m":
+            offset = offset / (OFFROAD_SPEED_KMPH / 3.6)
+
+        matrix = road + offset[:, None] + offset[None, :]
+        matrix[~np.isfinite(matrix)] = SPARSE_BIG_M
+        matrix = matrix.astype(int)
+        np.fill_diagonal(matrix, 0)
+        return matrix
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from optimizer import prepare_critical_df, solve_vrp
+
+# -------------------------------
+# Content-addressed route plan cache
+# -------------------------------
+CACHE_DIR = ".route_cache"
+
+# Arguments that observe a solve without changing its result
+UNHASHED_PARAMS = ("on_solution", "trace", "profile")
+
+def _update_frame(digest, df):
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    digest.update(row_hashes.to_numpy().tobytes())
+    digest.update(",".join(map(str, df.columns)).encode())
+
+def _param_value(name, value):
+    # JSON form of a solver argument; objects are reduced to the parts
+    # that change the result, never to their repr (a memory address).
+    if value is None:
+        return None
+    if name == "road_graph":
+        if value.fingerprint is None:
+            raise ValueError(
+                "road_graph has no fingerprint; build it with RoadGraph.load "
+                "or pass fingerprint= to cache its plans"
+            )
+        return value.fingerprint
+    if name == "matrix_store":
+        return {"dtype": value.dtype.str, "scale": value.scale}
+    return value
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    raise ValueError(f"Cannot hash solver argument of type {type(value).__name__} into a plan key")
+
+def plan_key(df, num_vehicles, vehicle_capacity, **params):
+    # Hash of the depot + High-risk frame (coordinates, demands and the
+    # row data the routes carry) and every result-affecting parameter.
+    critical_df = prepare_critical_df(df)
+    digest = hashlib.sha256()
+
+    if critical_df is not None:
+        _update_frame(digest, critical_df)
+
+    solver_params = {
+        "num_vehicles": num_vehicles,
+        "vehicle_capacity": vehicle_capacity,
+        **{k: _param_value(k, v) for k, v in params.items() if k not in UNHASHED_PARAMS},
+    }
+    digest.update(json.dumps(solver_params, sort_keys=True, default=_json_default).encode())
+    return digest.hexdigest()
+
+class RouteCache:
+    # In-memory LRU in front of a directory of pickled plans. The disk
+    # store is trimmed oldest-first (by last access) past max_bytes.
+
+    def __init__(self, directory=CACHE_DIR, max_entries=128,
+                 max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    routes = pickle.load(f)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                self.misses += 1
+                return None
+
+            os.utime(path)  # refresh LRU position on disk
+            self.disk_hits += 1
+            self._remember(key, routes)
+            return routes
+
+    def put(self, key, routes):
+        with self._lock:
+            self._remember(key, routes)
+
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(routes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._path(key))
+
+            self._trim_disk()
+
+    def _remember(self, key, routes):
+        self._memory[key] = routes
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_disk(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if os.path.isdir(self.directory):
+                for entry in os.scandir(self.directory):
+                    if entry.name.endswith(".pkl"):
+                        os.remove(entry.path)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._memory),
+        }
+
+route_cache = RouteCache()
+
+def cached_solve_vrp(df, num_vehicles=3, vehicle_capacity=200, cache=None,
+                     **params):
+    # Drop-in for solve_vrp. On a hit, on_solution/trace are not called.
+    cache = cache or route_cache
+    key = plan_key(df, num_vehicles, vehicle_capacity, **params)
+
+    routes = cache.get(key)
+    if routes is None:
+        routes = solve_vrp(df, num_vehicles, vehicle_capacity, **params)
+        cache.put(key, routes)
+
+    return routes
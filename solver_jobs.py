@@ -0,0 +1,231 @@
+import itertools
+import multiprocessing
+import sys
+import threading
+import time
+import types
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from contextlib import contextmanager
+
+from optimizer import SolveProfile, solve_vrp
+from route_cache import plan_key, route_cache
+
+# -------------------------------
+# Background solver job service
+# -------------------------------
+# Finished jobs kept for polling before the oldest are forgotten
+MAX_FINISHED_JOBS = 100
+
+# Workers and the Manager start from a fresh interpreter instead of
+# fork()ing the threaded server, whose held locks the child would copy
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+@contextmanager
+def _main_script_hidden():
+    # forkserver/spawn children re-run sys.modules["__main__"] before
+    # unpickling their task; under `streamlit run` that is the app
+    # script, which must not render again inside a worker. Workers only
+    # need this module, so an empty __main__ stands in while they start.
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = (
+    "pending", "running", "done", "failed", "cancelled"
+)
+
+def _run_job(job_id, df, num_vehicles, vehicle_capacity, params,
+             progress, cancelled):
+    # Runs in a pool process; streams improvements back to the service
+    # and stops at the next improvement once the job is cancelled.
+    progress.put((job_id, None, 0.0))
+
+    def on_solution(cost, elapsed):
+        progress.put((job_id, cost, elapsed))
+        return job_id in cancelled
+
+    profile = SolveProfile()
+    routes = solve_vrp(
+        df, num_vehicles, vehicle_capacity, on_solution=on_solution,
+        profile=profile, **params
+    )
+    return routes, profile
+
+class SolverJob:
+    # Service-side record of one submitted solve; status() is what the
+    # Route Optimizer tab polls.
+
+    def __init__(self, job_id, key, time_limit=None):
+        self.job_id = job_id
+        self.key = key
+        self.time_limit = time_limit
+        self.state = PENDING
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.best_cost = None
+        self.solutions = 0
+        self.routes = None
+        self.profile = None  # SolveProfile; None when served from cache
+        self.error = None
+        self.future = None
+
+    @property
+    def active(self):
+        return self.state in (PENDING, RUNNING)
+
+    def status(self):
+        elapsed = 0.0
+        if self.started:
+            elapsed = (self.finished or time.time()) - self.started
+
+        progress = 1.0 if not self.active else 0.0
+        if self.state == RUNNING and self.time_limit:
+            progress = min(elapsed / self.time_limit, 0.99)
+
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "progress": progress,
+            "elapsed": elapsed,
+            "best_cost": self.best_cost,
+            "solutions": self.solutions,
+            "error": self.error,
+        }
+
+class SolverJobService:
+    # Process pool behind the Route Optimizer tab, shared by every
+    # session on the server. Identical plans (same route_cache key)
+    # share one in-flight job, and finished plans go to the route cache.
+    # profile_log appends each solve's SolveProfile as a JSON line.
+
+    def __init__(self, max_workers=None, cache=route_cache, profile_log=None):
+        self.cache = cache
+        self.profile_log = profile_log
+        context = multiprocessing.get_context(START_METHOD)
+        with _main_script_hidden():
+            self._manager = context.Manager()
+            self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+            # Non-fork pools start every worker on the first submit
+            self._pool.submit(int).result()
+        self._progress = self._manager.Queue()
+        self._cancelled = self._manager.dict()
+        self._jobs = {}
+        self._active_keys = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+        threading.Thread(target=self._drain_progress, daemon=True).start()
+
+    def submit(self, df, num_vehicles=3, vehicle_capacity=200, **params):
+        key = plan_key(df, num_vehicles, vehicle_capacity, **params)
+
+        with self._lock:
+            if key in self._active_keys:
+                return self._active_keys[key]
+
+            job_id = f"job-{next(self._ids)}"
+            job = SolverJob(job_id, key, params.get("time_limit"))
+            self._jobs[job_id] = job
+
+            cached = self.cache.get(key) if self.cache else None
+            if cached is not None:
+                job.state = DONE
+                job.started = job.finished = time.time()
+                job.routes = cached
+                self._forget_old_jobs()
+                return job_id
+
+            self._active_keys[key] = job_id
+            job.future = self._pool.submit(
+                _run_job, job_id, df, num_vehicles, vehicle_capacity, params,
+                self._progress, self._cancelled
+            )
+
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job_id
+
+    def _finish(self, job, future):
+        routes = profile = None
+        try:
+            routes, profile = future.result()
+        except CancelledError:
+            pass
+        except Exception as exc:  # surfaced through status()
+            job.error = str(exc)
+
+        with self._lock:
+            self._active_keys.pop(job.key, None)
+            job.finished = time.time()
+            if job.job_id in self._cancelled or future.cancelled():
+                job.state = CANCELLED
+                self._cancelled.pop(job.job_id, None)
+            elif job.error is not None:
+                job.state = FAILED
+            else:
+                job.state = DONE
+                job.routes = routes
+                job.profile = profile
+                if self.cache is not None and routes:
+                    self.cache.put(job.key, routes)
+            self._forget_old_jobs()
+
+        if profile is not None and self.profile_log:
+            profile.log(self.profile_log, job_id=job.job_id, key=job.key,
+                        state=job.state)
+
+    def _drain_progress(self):
+        while True:
+            try:
+                job_id, cost, elapsed = self._progress.get()
+            except (EOFError, OSError):
+                return
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or not job.active:
+                    continue
+                if job.state == PENDING:
+                    job.state = RUNNING
+                    job.started = time.time()
+                if cost is not None:
+                    job.best_cost = cost
+                    job.solutions += 1
+
+    def _forget_old_jobs(self):
+        finished = [j for j in self._jobs.values() if not j.active]
+        for job in sorted(finished, key=lambda j: j.finished)[:-MAX_FINISHED_JOBS]:
+            del self._jobs[job.job_id]
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.status() if job else None
+
+    def result(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.routes if job else None
+
+    def profile(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.profile if job else None
+
+    def cancel(self, job_id):
+        # Pending jobs are dropped; running ones stop at their next
+        # improving solution (OR-Tools cannot be interrupted mid-move).
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.active:
+                return False
+            self._cancelled[job_id] = True
+            future = job.future
+        future.cancel()
+        return True
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._manager.shutdown()